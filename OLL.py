@@ -1,100 +1,80 @@
 import sys, pathlib
 sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
-import cube
+import cube, lastlayer
+
+# the 57 orientation algorithms, by their usual numbers
+ALGORITHMS = {
+    1: "R U2 R2 F R F' U2 R' F R F'",
+    2: "F R U R' U' F' f R U R' U' f'",
+    3: "f R U R' U' f' U' F R U R' U' F'",
+    4: "f R U R' U' f' U F R U R' U' F'",
+    5: "r' U2 R U R' U r",
+    6: "r U2 R' U' R U' r'",
+    7: "r U R' U R U2 r'",
+    8: "l' U' L U' L' U2 l",
+    9: "R U R' U' R' F R2 U R' U' F'",
+    10: "R U R' U R' F R F' R U2 R'",
+    11: "r U R' U R' F R F' R U2 r'",
+    12: "M' R' U' R U' R' U2 R U' R r'",
+    13: "F U R U' R2 F' R U R U' R'",
+    14: "R' F R U R' F' R F U' F'",
+    15: "r' U' r R' U' R U r' U r",
+    16: "r U r' R U R' U' r U' r'",
+    17: "R U R' U R' F R F' U2 R' F R F'",
+    18: "r U R' U R U2 r2 U' R U' R' U2 r",
+    19: "r' R U R U R' U' M' R' F R F'",
+    20: "r U R' U' M2 U R U' R' U' M'",
+    21: "R U2 R' U' R U R' U' R U' R'",
+    22: "R U2 R2 U' R2 U' R2 U2 R",
+    23: "R2 D' R U2 R' D R U2 R",
+    24: "r U R' U' r' F R F'",
+    25: "F' r U R' U' r' F R",
+    26: "R U2 R' U' R U' R'",
+    27: "R U R' U R U2 R'",
+    28: "r U R' U' M U R U' R'",
+    29: "R U R' U' R U' R' F' U' F R U R'",
+    30: "F U R U2 R' U' R U2 R' U' F'",
+    31: "R' U' F U R U' R' F' R",
+    32: "L U F' U' L' U L F L'",
+    33: "R U R' U' R' F R F'",
+    34: "R U R2 U' R' F R U R U' F'",
+    35: "R U2 R2 F R F' R U2 R'",
+    36: "L' U' L U' L' U L U L F' L' F",
+    37: "F R' F' R U R U' R'",
+    38: "R U R' U R U' R' U' R' F R F'",
+    39: "L F' L' U' L U F U' L'",
+    40: "R' F R U R' U' F' U R",
+    41: "R U R' U R U2 R' F R U R' U' F'",
+    42: "R' U' R U' R' U2 R F R U R' U' F'",
+    43: "f' L' U' L U f",
+    44: "f R U R' U' f'",
+    45: "F R U R' U' F'",
+    46: "R' U' R' F R F' U R",
+    47: "R' U' R' F R F' R' F R F' U R",
+    48: "F R U R' U' R U R' U' F'",
+    49: "r U' r2 U r2 U r2 U' r",
+    50: "r' U r2 U' r2 U' r2 U r'",
+    51: "f R U R' U' R U R' U' f'",
+    52: "R U R' U R U' B U' B' R'",
+    53: "l' U2 L U L' U' L U L' U l",
+    54: "r U2 R' U' R U R' U' R U' r'",
+    55: "R' F R U R U' R2 F' R2 U' R' U R U R'",
+    56: "r' U' r U' R' U R U' R' U R r' U r",
+    57: "R U R' U' M' U R U' r'",
+}
+
+
+def _orientation(state: bytes) -> lastlayer.Key:
+    return tuple(state[pos] % 3 for pos in lastlayer.LAST_LAYER)
+
+
+# twist of every top layer piece, mapped to the top layer turn and algorithm that orient them all
+CASES = lastlayer.case_table(ALGORITHMS.values(), _orientation)
 
 
 def oll(cubeobj: cube.Cube) -> None:
-    cross(cubeobj)
-    finish_oll(cubeobj)
+    case = tuple(cubeobj[pos].twist(cubeobj.top) for pos in lastlayer.LAST_LAYER)
+    if case not in CASES:
+        raise ValueError('Cube cannot be solved: a corner is twisted or an edge is flipped')
 
-
-############################# CROSS #############################
-
-# make cross
-def cross(cubeobj: cube.Cube) -> None:
-    hinge_algorithm = "F U R U' R' F'"
-    line_algorithm = "F R U R' U' F'"
-
-    if _check_cross(cubeobj):
-        return
-
-    if _is_hinge(cubeobj):
-        cubeobj.perform_algorithm(hinge_algorithm)
-
-    elif _is_line(cubeobj):
-        cubeobj.perform_algorithm(line_algorithm)
-
-    # or it is dot
-    else:
-        cubeobj.perform_algorithm(hinge_algorithm)
-        cross(cubeobj)
-
-
-# check if there is a cross on the top layer
-def _check_cross(cubeobj: cube.Cube) -> bool:
-    topcolour = cubeobj.top
-    cubelist = cubeobj.cube
-    return cubelist[8][1] == cubelist[9][1] == cubelist[10][1] == cubelist[11][1] == topcolour
-
-
-def _is_hinge(cubeobj: cube.Cube) -> bool:
-    for _ in range(4):
-        if cubeobj.cube[8][1] == cubeobj.cube[9][1] == cubeobj.top:
-            return True
-
-        cubeobj.cube_move('U')
-
-
-def _is_line(cubeobj: cube.Cube) -> bool:
-    for _ in range(2):
-        if cubeobj.cube[8][1] == cubeobj.cube[9][1] == cubeobj.top:
-            return True
-
-        cubeobj.cube_move('U')
-
-
-############################################## FINISH OLL ##############################################
-def finish_oll(cubeobj: cube.Cube) -> None:
-    oll_algo = "R U R' U R U2 R'"
-
-    while not _is_oll_complete(cubeobj):
-        cross_type = _get_cross_type(cubeobj)
-        _position_cross(cubeobj, cross_type)
-        cubeobj.perform_algorithm(oll_algo)
-
-    return
-
-
-def _get_cross_type(cubeobj: cube.Cube) -> int:
-    count = 0
-    for corner in (0, 1, 2, 3):
-        if cubeobj.cube[corner][1] == cubeobj.top:
-            count += 1
-
-    return count
-
-
-def _position_cross(cubeobj: cube.Cube, cross_type: int) -> None:
-    # no matter what type of cross, you are always looking at UFL corner, just a different colour each time
-    type_index = {
-        0: 2,  # no colours on top you position the UFL corner with yellow on the left
-        1: 1,  # 1 colour on top, you position cube so UFL corner has yellow on top
-        2: 0  # 2 colours on top, you position cube so UFL corner has yellow facing
-    }
-    colour = type_index[cross_type]
-
-    while cubeobj.cube[2][colour] != cubeobj.top:
-        cubeobj.cube_move('U')
-
-    return
-
-
-def _is_oll_complete(cubeobj: cube.Cube) -> bool:
-    # positions of top side
-    topside = (0, 1, 2, 3, 8, 9, 10, 11)
-
-    for piece in topside:
-        if cubeobj.cube[piece][1] != cubeobj.top:
-            return False
-
-    return True
+    cubeobj.perform_algorithm(CASES[case])
@@ -0,0 +1,164 @@
+"""Solve a file of cube definition strings (see cube.build) across a pool of worker processes.
+
+Definitions are read lazily and sent to the workers in chunks, with only a few chunks in flight per worker, so memory
+stays flat however long the file is. Results come back either in input order or as soon as each chunk completes.
+
+    python batchsolve.py definitions.txt --method twophase --workers 8 > results.txt
+"""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+import argparse, itertools, os, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, List, NamedTuple, Optional, TextIO
+import cube, solutioncache, solvestats
+
+
+class Result(NamedTuple):
+    index: int
+    definition: str
+    solution: Optional[str]
+    seconds: float
+    error: Optional[str] = None
+    stats: Optional[solvestats.SolveStats] = None
+
+
+def read_definitions(path) -> Iterator[str]:
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def _chunks(definitions: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(definitions)
+    chunk = list(itertools.islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(iterator, size))
+
+
+# solutions already found by this worker process, when solve_all is given a cache_size
+_cache: Optional[solutioncache.SolutionCache] = None
+
+
+def _worker_cache(size: int) -> Optional[solutioncache.SolutionCache]:
+    global _cache
+    if size and (_cache is None or _cache.maxsize != size):
+        _cache = solutioncache.SolutionCache(size)
+
+    return _cache if size else None
+
+
+def _solve_chunk(start: int, definitions: List[str], method: str, stats: bool, cache_size: int = 0) -> List[Result]:
+    cache = _worker_cache(cache_size)
+    results = []
+    for index, definition in enumerate(definitions, start):
+        solve_stats = solvestats.SolveStats() if stats else None
+        begin = time.perf_counter()
+        try:
+            solution = cube.build(definition).solve(method=method, stats=solve_stats, cache=cache)
+        except ValueError as error:
+            results.append(Result(index, definition, None, time.perf_counter() - begin, str(error)))
+        # anything else going wrong with one cube is kept with its result rather than ending the whole run
+        except Exception as error:
+            results.append(Result(index, definition, None, time.perf_counter() - begin,
+                                  '{}: {}'.format(type(error).__name__, error)))
+        else:
+            results.append(Result(index, definition, solution, time.perf_counter() - begin, stats=solve_stats))
+
+    return results
+
+
+def solve_all(definitions: Iterable[str], workers: Optional[int] = None, chunksize: int = 64, method='layers',
+              ordered=True, stats=False, cache_size=0) -> Iterator[Result]:
+    """Yield a Result for every definition, solved by a pool of workers (one per CPU by default). With ordered=False
+    results are yielded chunk by chunk as they finish rather than in input order. With stats=True every solved
+    Result carries the solvestats.SolveStats of its solve. With a cache_size every worker keeps that many solutions
+    (see solutioncache.py), so that a position it has solved before is solved again by a lookup."""
+    workers = workers or os.cpu_count() or 1
+    if method == 'twophase':
+        # build or check the table cache once here rather than in every worker
+        import twophase
+        twophase.tables()
+
+    chunks = enumerate(_chunks(definitions, chunksize))
+    with ProcessPoolExecutor(workers) as executor:
+        pending, finished, next_chunk = {}, {}, 0
+        for number, chunk in itertools.islice(chunks, 2 * workers):
+            pending[executor.submit(_solve_chunk, number * chunksize, chunk, method, stats, cache_size)] = number
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished[pending.pop(future)] = future.result()
+                for number, chunk in itertools.islice(chunks, 1):
+                    future = executor.submit(_solve_chunk, number * chunksize, chunk, method, stats, cache_size)
+                    pending[future] = number
+
+            if ordered:
+                while next_chunk in finished:
+                    yield from finished.pop(next_chunk)
+                    next_chunk += 1
+            else:
+                for number in list(finished):
+                    yield from finished.pop(number)
+
+
+def run(path, output: TextIO = sys.stdout, **options) -> dict:
+    """solve every definition in path, writing a line per result and then the totals; returns the totals, along with
+    histograms of the solve statistics when stats=True"""
+    histograms = solvestats.Histograms()
+    begin = time.perf_counter()
+    solved = failed = moves = 0
+    solve_time = 0.0
+    for result in solve_all(read_definitions(path), **options):
+        solve_time += result.seconds
+        if result.error is None:
+            solved += 1
+            moves += len(result.solution.split())
+            if result.stats is not None:
+                histograms.add(result.stats)
+            output.write('{:^16}\t{:^10}\t{}\n'.format('Scramble {}'.format(result.index + 1),
+                                                     len(result.solution.split()), result.seconds))
+        else:
+            failed += 1
+            output.write('{:^16}\t{:^10}\t{}\n'.format('Scramble {}'.format(result.index + 1), 'invalid', result.error))
+
+    wall = time.perf_counter() - begin
+    totals = {
+        'solved': solved,
+        'failed': failed,
+        'wall_seconds': wall,
+        'solves_per_second': (solved + failed) / wall if wall else 0.0,
+        'mean_solve_seconds': solve_time / (solved + failed) if solved + failed else 0.0,
+        'mean_moves': moves / solved if solved else 0.0
+    }
+    output.write('Solved {solved}, failed {failed} in {wall_seconds:.2f}s: {solves_per_second:.1f} solves/s, '
+                 '{mean_solve_seconds:.4f}s and {mean_moves:.1f} moves per solve\n'.format(**totals))
+    if histograms.solves:
+        totals['histograms'] = histograms.as_dict()
+        for phase, fields in totals['histograms']['phases'].items():
+            output.write('{:<14} most moves {}, most references {}\n'.format(phase, fields['moves'][-1][0],
+                                                                         fields['references'][-1][0]))
+
+    return totals
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Solve a file of cube definitions, one per line, in parallel')
+    parser.add_argument('path')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, one per CPU by default')
+    parser.add_argument('--chunksize', type=int, default=64, help='definitions sent to a worker at a time')
+    parser.add_argument('--method', choices=('layers', 'twophase'), default='layers')
+    parser.add_argument('--unordered', action='store_true', help='print results as soon as they are ready')
+    parser.add_argument('--cache', type=int, default=0, help='solutions each worker keeps to answer repeated cubes')
+    parser.add_argument('--stats', help='file to write histograms of the per-phase solve statistics to, as JSON')
+    args = parser.parse_args()
+    totals = run(args.path, workers=args.workers, chunksize=args.chunksize, method=args.method,
+                 ordered=not args.unordered, stats=bool(args.stats), cache_size=args.cache)
+    if args.stats:
+        import json
+        with open(args.stats, 'w') as file:
+            json.dump(totals['histograms'], file)
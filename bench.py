@@ -0,0 +1,187 @@
+"""Benchmarks for move application, algorithm parsing, build/define round trips and every phase of the layer by layer
+solve, run over the cube definitions in the scramble logs (the After: column of scrambles10.txt and co.).
+
+Every benchmark reports the number of samples and the mean, min, p50, p90, p99 and max time per sample in
+microseconds (solve.moves reports solution lengths instead). Results are written as JSON. Pass --compare with an
+earlier file to list benchmarks whose median got slower by more than --threshold.
+
+    python bench.py --limit 500 --output before.json
+    python bench.py --limit 500 --output after.json --compare before.json
+"""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+import argparse, gc, json, platform, time
+from typing import Callable, Dict, Iterable, List
+import cube, F2L, OLL, PLL, replay, scramble
+
+HERE = pathlib.Path(__file__).parent
+CORPORA = ('scrambles10.txt', 'scrambles50.txt', 'scrambles75.txt')
+# move types timed by the moves benchmark
+MOVE_TYPES = {
+    'face': ('R', 'L', 'U', 'D', 'F', 'B'),
+    'prime': ("R'", "L'", "U'", "D'", "F'", "B'"),
+    'half': ('R2', 'L2', 'U2', 'D2', 'F2', 'B2'),
+    'rotation': ('x', 'y', 'z', "x'", "y'", "z'", 'x2', 'y2', 'z2'),
+    'slice': ('M', 'E', 'S', "M'", "E'", "S'", 'M2', 'E2', 'S2')
+}
+PHASES = (('cross', F2L.cross), ('corners', F2L.corners), ('edges', F2L.edges), ('oll', OLL.oll), ('pll', PLL.pll))
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """nearest rank percentile of an already sorted list"""
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(samples: List[float], scale: float = 1e6) -> dict:
+    """statistics of samples given in seconds, reported in microseconds unless scale says otherwise"""
+    ordered = sorted(sample * scale for sample in samples)
+    return {
+        'samples': len(ordered),
+        'mean': sum(ordered) / len(ordered),
+        'min': ordered[0],
+        'p50': percentile(ordered, 0.5),
+        'p90': percentile(ordered, 0.9),
+        'p99': percentile(ordered, 0.99),
+        'max': ordered[-1]
+    }
+
+
+def read_corpus(paths: Iterable, limit: int = None) -> List[str]:
+    """the After: definitions of the scramble logs, at most limit of them from each"""
+    return [record.after for record in replay.read_logs(paths, limit)]
+
+
+def _time(function: Callable, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def bench_moves(rounds: int = 200, batch: int = 100) -> Dict[str, dict]:
+    """Cube.cube_move per move type; each sample is the mean of batch calls as one call is too short to time"""
+    results = {}
+    cubeobj = cube.Cube()
+    for kind, moves in MOVE_TYPES.items():
+        samples = []
+        for _ in range(rounds):
+            for move in moves:
+                start = time.perf_counter()
+                for _ in range(batch):
+                    cubeobj.cube_move(move, False)
+                samples.append((time.perf_counter() - start) / batch)
+
+        results['cube_move.' + kind] = summarize(samples)
+
+    return results
+
+
+def bench_parsing(scrambles: List[str]) -> Dict[str, dict]:
+    """parsing and fusing a move string, and performing it with and without the compiled algorithm cache"""
+    parse, perform, cached = [], [], []
+    for moves in scrambles:
+        parse.append(_time(cube.Algorithm, moves))
+        cube.compile_algo.cache_clear()
+        perform.append(_time(cube.Cube().perform_algorithm, moves))
+        cached.append(_time(cube.Cube().perform_algorithm, moves))
+
+    return {'algorithm.parse': summarize(parse), 'perform_algorithm.uncached': summarize(perform),
+            'perform_algorithm.cached': summarize(cached)}
+
+
+def bench_roundtrip(definitions: List[str]) -> Dict[str, dict]:
+    builds, defines = [], []
+    for definition in definitions:
+        start = time.perf_counter()
+        cubeobj = cube.build(definition)
+        builds.append(time.perf_counter() - start)
+        defines.append(_time(cubeobj.define))
+
+    return {'build': summarize(builds), 'define': summarize(defines)}
+
+
+def bench_solve(definitions: List[str]) -> Dict[str, dict]:
+    """every phase of the layer by layer method in turn, then the whole solve from scratch"""
+    phases = {name: [] for name, _ in PHASES}
+    solves, lengths = [], []
+    for definition in definitions:
+        cubeobj = cube.build(definition)
+        for name, phase in PHASES:
+            phases[name].append(_time(phase, cubeobj))
+
+        cubeobj = cube.build(definition)
+        start = time.perf_counter()
+        lengths.append(len(cubeobj.solve().split()))
+        solves.append(time.perf_counter() - start)
+
+    results = {'phase.' + name: summarize(samples) for name, samples in phases.items()}
+    results['solve'] = summarize(solves)
+    # not a time, but regressions in solution length matter as much
+    results['solve.moves'] = summarize(lengths, scale=1)
+    return results
+
+
+def run(corpora: Iterable = CORPORA, limit: int = 200, seed: int = 0) -> dict:
+    definitions = read_corpus([path if pathlib.Path(path).exists() else HERE / path for path in corpora], limit)
+    scrambles = list(scramble.scrambles(len(definitions), 25, seed))
+
+    results = {}
+    # as timeit does, keep collections from landing in random samples
+    gc.disable()
+    try:
+        results.update(bench_moves())
+        results.update(bench_parsing(scrambles))
+        results.update(bench_roundtrip(definitions))
+        results.update(bench_solve(definitions))
+    finally:
+        gc.enable()
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'corpora': [str(path) for path in corpora],
+        'definitions': len(definitions),
+        'seed': seed,
+        'unit': 'microseconds, moves for solve.moves',
+        'results': results
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float = 0.25) -> List[str]:
+    """benchmarks whose median is more than threshold (a fraction) above the baseline's"""
+    regressions = []
+    for name, stats in report['results'].items():
+        before = baseline['results'].get(name)
+        if before and before['p50'] and stats['p50'] > before['p50'] * (1 + threshold):
+            regressions.append('{}: p50 {:.2f} -> {:.2f} ({:+.0%})'.format(name, before['p50'], stats['p50'],
+                                                                           stats['p50'] / before['p50'] - 1))
+
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the cube engine and layer by layer solver')
+    parser.add_argument('--corpus', nargs='+', default=CORPORA, help='scramble logs to take definitions from')
+    parser.add_argument('--limit', type=int, default=200, help='definitions used from each log')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='file to write the JSON report to, standard output by default')
+    parser.add_argument('--compare', help='earlier JSON report to check for regressions against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='slowdown of the median counted as a regression')
+    args = parser.parse_args()
+
+    report = run(args.corpus, args.limit, args.seed)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(report, json.load(file), args.threshold)
+
+        for regression in regressions:
+            print('Regression in ' + regression, file=sys.stderr)
+
+        sys.exit(1 if regressions else 0)
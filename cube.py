@@ -5,8 +5,8 @@ import sys, pathlib
 sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
 
 from typing import Tuple, Union, List
-from projeuler.commonFunctions import invert_dict
-import random
+from functools import lru_cache
+import cubie, facelets, render, scramble, tracelog, validate
 
 # Positions:
 # Corners:
@@ -32,14 +32,17 @@ NoneStr = Union[str, None]
 # valid moves index
 validmoves = ['R', 'Rp', 'L', 'Lp', 'U', 'Up', 'D', 'Dp', 'B', 'Bp', 'F', 'Fp', 'R2', 'L2', 'U2', 'D2', 'B2', 'F2',
               "R'", "L'", "U'", "D'", "B'", "F'", 'x', 'y', 'z', 'xp', 'yp', 'zp', "x'", "y'", "z'", 'x2', 'y2', 'z2',
-              'M', 'Mp', "M'", 'S', "Sp", "S'", 'E', 'Ep', "E'", 'M2', 'S2', 'E2']
+              'M', 'Mp', "M'", 'S', "Sp", "S'", 'E', 'Ep', "E'", 'M2', 'S2', 'E2',
+              'r', 'rp', "r'", 'r2', 'l', 'lp', "l'", 'l2', 'u', 'up', "u'", 'u2', 'd', 'dp', "d'", 'd2',
+              'f', 'fp', "f'", 'f2', 'b', 'bp', "b'", 'b2']
 cubedefinition = ''
 
 
 class Piece:
-    def __init__(self, pos: int, x: str, y: str, z: str):
-        self.orientation = (x, y, z)
-        self.pos = pos
+    """live view of the cubie whose home is position label; follows it around as the cube is moved"""
+    def __init__(self, cubeobj: 'Cube', label: int):
+        self._cube = cubeobj
+        self._label = label
 
     def __eq__(self, other):
         return self.pos == other.pos and self.orientation == other.orientation
@@ -47,57 +50,19 @@ class Piece:
     def __getitem__(self, item):
         return self.orientation[item]
 
-    def piece_move(self, move, iscorner: bool = True) -> None:
-        if move.endswith('p') or move.endswith("'"):
-            clockwise = False
+    @property
+    def pos(self) -> int:
+        return self._cube._where[self._label] // 3
 
-        else:
-            clockwise = True
-
-        axisindex = {
-            # x and y colours are swapped, z colour remains the same
-            'R': (2, 0, 1),
-            'L': (2, 0, 1),
-            # x and z colours are swapped, y colour remains the same
-            'U': (1, 0, 2),
-            'D': (1, 0, 2),
-            # z and y colours are swapped, x colour remains the same
-            'B': (0, 2, 1),
-            'F': (0, 2, 1)
-        }
-        if iscorner:
-            moveindex = {
-                'R': (1, 5, 7, 3),
-                'L': (0, 2, 6, 4),
-                'U': (0, 1, 3, 2),
-                'D': (4, 6, 7, 5),
-                'B': (0, 4, 5, 1),
-                'F': (2, 3, 7, 6)
-            }
+    @property
+    def orientation(self) -> tuple:
+        pos = self.pos
+        return self._cube._colours[pos][self._cube._state[pos]]
 
-        else:
-            moveindex = {
-                'R': (10, 13, 18, 15),
-                'L': (8, 14, 16, 12),
-                'U': (8, 9, 10, 11),
-                'D': (16, 19, 18, 17),
-                'B': (9, 12, 17, 13),
-                'F': (11, 15, 19, 14)
-            }
-
-        # transform position
-        pos1, pos2, pos3, pos4 = moveindex[move[0]][0], moveindex[move[0]][1], moveindex[move[0]][2], \
-                                 moveindex[move[0]][3]
-        _generic_pos_move(self, pos1, pos2, pos3, pos4, clockwise)
-
-        # transform orientation
-        constant, switch1, switch2 = axisindex[move[0]][0], axisindex[move[0]][1], axisindex[move[0]][2]
-        _generic_orientation_move(self, constant, switch1, switch2)
-
-        # double moves
-        if move.endswith('2'):
-            _generic_pos_move(self, pos1, pos2, pos3, pos4, clockwise)
-            _generic_orientation_move(self, constant, switch1, switch2)
+    def twist(self, colour: str) -> int:
+        """how the piece is twisted, as in cubie.py: the index in its position's reference cycle of the axis showing
+        colour"""
+        return cubie.CYCLES[self.pos].index(self.orientation.index(colour))
 
 
 class Square:
@@ -109,36 +74,13 @@ class Square:
             self.colour = 'Unknown'
 
     def __str__(self):
-        colourindex = {
-            'w': '[w]',
-            'y': '[y]',
-            'r': '[r]',
-            'o': '[o]',
-            'g': '[g]',
-            'b': '[b]',
-            'Unknown': '[NA]'
-        }
-
-        return colourindex[self.colour]
+        return render.text_cell(self.colour)
 
     def __repr__(self):
-        ansicolourindex = {
-            'w': "\x1b[48;2;255;255;255m",
-            'y': "\x1b[48;2;255;255;45m",
-            'r': "\x1b[48;2;255;0;0m",
-            'o': "\x1b[48;2;255;110;0m",
-            'g': "\x1b[48;2;0;255;0m",
-            'b': "\x1b[48;2;0;174;255m",
-            'Unknown': "\x1b[40m"
-        }
-
-        return ansicolourindex[self.colour] + "  \x1b[49m"
+        return render.ansi_cell(self.colour)
 
 
 class Corner(Piece):
-    def __init__(self, pos: int, x: str, y: str, z: str) -> None:
-        super().__init__(pos, x, y, z)
-
     def __str__(self):
         x, y, z = self.orientation[0], self.orientation[1], self.orientation[2]
         x, y, z = Square(x), Square(y), Square(z)
@@ -153,9 +95,6 @@ class Corner(Piece):
 
 
 class Edge(Piece):
-    def __init__(self, pos: int, x: NoneStr, y: NoneStr, z: NoneStr) -> None:
-        super().__init__(pos, x, y, z)
-
     def __str__(self):
         squares = [Square(colour) for colour in self.orientation if colour]
         return '{}{}'.format(squares[0], squares[1])
@@ -164,9 +103,6 @@ class Edge(Piece):
         squares = [Square(colour) for colour in self.orientation if colour]
         return '{}{}'.format(repr(squares[0]), repr(squares[1]))
 
-    def piece_move(self, move: str, iscorner: bool = False) -> None:
-        super().piece_move(move, iscorner)
-
 
 class Cube:
     def __init__(self, front='green', right='red', top='white'):
@@ -179,14 +115,17 @@ class Cube:
             'o': 'r'
         }
 
-        self.front = front[0].lower()
-        self.back = opposites[self.front]
-
-        self.right = right[0].lower()
-        self.left = opposites[self.right]
-
-        self.top = top[0].lower()
-        self.bottom = opposites[self.top]
+        front, right, top = front[0].lower(), right[0].lower(), top[0].lower()
+        # centre colours in cubie.FACES order; _palette keeps the centres the piece labels were defined against
+        self._centres = self._palette = (top, front, right, opposites[front], opposites[right], opposites[top])
+        self._colours = _colour_table(self._palette)
+        self._state = cubie.SOLVED
+        self._where = cubie.locate(self._state)
+        # list of performed moves while solve() is recording, None otherwise
+        self._recording = None
+        # solvestats.SolveStats being filled in while solving, if any
+        self._stats = None
+        self._pieces = [Corner(self, label) if label <= 7 else Edge(self, label) for label in range(20)]
 
         self.orientation = (self.front, self.right, self.top)
         self.axes = {
@@ -197,280 +136,245 @@ class Cube:
 
         self.positions = _generate_positions(self)
 
-        x, y, z = 0, 1, 2
-        p = self.positions
-        corners = [Corner(pos, p[pos][x], p[pos][y], p[pos][z]) for pos in self.positions if pos <= 7]
-        edges = [Edge(pos, p[pos][x], p[pos][y], p[pos][z]) for pos in self.positions if pos >= 8]
+    top = property(lambda self: self._centres[cubie.TOP])
+    front = property(lambda self: self._centres[cubie.FRONT])
+    right = property(lambda self: self._centres[cubie.RIGHT])
+    back = property(lambda self: self._centres[cubie.BACK])
+    left = property(lambda self: self._centres[cubie.LEFT])
+    bottom = property(lambda self: self._centres[cubie.BOTTOM])
 
-        self.cube = corners + edges
+    @property
+    def cube(self) -> List[Piece]:
+        pieces = self._pieces
+        return [pieces[code // 3] for code in self._state]
 
     def __repr__(self) -> str:
-        # there will be a total of 9 vertical rows in the display/ the actual printing must be done in this way
-        sides = _generate_sides(self)
-        display = []
-
-        # create rows for each side
-        for side in sides:
-            side = sides[side]
-            for row in range(len(side)):
-                side[row] = ''.join([repr(square) for square in side[row]])
-
-        # top side
-        for row in sides[self.top]:
-            display.append('      {}'.format(row))
-
-        # middle (in the display) sides: left, front, right, back
-        for linenum in range(3):
-            line = sides[self.left][linenum] + sides[self.front][linenum] + sides[self.right][linenum] + \
-                   sides[self.back][linenum]
-
-            display.append(line)
-
-        # bottom side
-        for row in sides[self.bottom]:
-            display.append('      {}'.format(row))
-
-        display = '\n'.join(display)
-        return display + '\n'
+        # 9 rows of ANSI cells: the top side, then left, front, right and back side by side, then the bottom side
+        return render.draw_state(self._state, self._palette, self._centres) + '\n'
 
     def __str__(self) -> str:
-        # there will be a total of 9 rows top to bottom in the display
-        sides = _generate_sides(self)
-        display = []
+        return render.draw_state(self._state, self._palette, self._centres, False)
 
-        # create rows for each side
-        for side in sides:
-            side = sides[side]
-            for row in range(len(side)):
-                side[row] = ''.join([str(square) for square in side[row]])
-
-        # top side
-        for row in sides[self.top]:
-            display.append('         {}'.format(row))
-
-        # middle sides: left, front, right, back
-        for linenum in range(3):
-            line = sides[self.left][linenum] + sides[self.front][linenum] + sides[self.right][linenum] + \
-                   sides[self.back][linenum]
+    def __eq__(self, other):
+        if not isinstance(other, Cube):
+            return NotImplemented
 
-            display.append(line)
+        return self.key() == other.key()
 
-        # bottom side
-        for row in sides[self.bottom]:
-            display.append('         {}'.format(row))
+    # cubes are mutable: a cube stored in a set or dict must not be moved afterwards
+    def __hash__(self):
+        return hash(self.key())
 
-        display = '\n'.join(display)
-        return display
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self.cube[item]
 
-    def __eq__(self, other):
-        reverse_seq = ' '.join(self._make_sameorientation(other).__reversed__())
-        equality = self.cube == other.cube
-        self.perform_algorithm(reverse_seq, printrepr=False)
-        return equality
+        return self._pieces[self._state[item] // 3]
 
-    def __getitem__(self, item):
-        return self.cube[item]
-
-    def _make_sameorientation(self, other):
-        """ cycle through all 24 possible orientations until orientations of self and other are the same """
-        reverse_seq = []
-        for z in range(4):
-            for y in range(4):
-                self.cube_move('y')
-                reverse_seq.append('yp')
-                if self._get_orientation() == other._get_orientation():
-                    return reverse_seq
-            self.cube_move('z')
-            reverse_seq.append('zp')
-
-        self.cube_move('x')
-        reverse_seq = ['xp']
-        for y in range(4):
-            self.cube_move('y')
-            reverse_seq.append('yp')
-            if self._get_orientation() == other._get_orientation():
-                return reverse_seq
-
-        self.cube_move('x2')
-        reverse_seq = ['x']
-        for y in range(4):
-            self.cube_move('y')
-            reverse_seq.append('yp')
-            if self._get_orientation() == other._get_orientation():
-                return reverse_seq
-
-    def _get_orientation(self):
-        return self.front, self.right, self.top
+    def key(self) -> str:
+        """Canonical string for the colouring of the cube, the same for any whole cube rotation of it. The cube is
+        turned so that its centres read lowest first (U F R B L D), and then every piece is written out."""
+        rotation = _canonical_rotation(self._centres)
+        stickers = _sticker_table(self._palette)
+        state = cubie.apply(self._state, rotation)
+        return ''.join([self._centres[face] for face in rotation.centres]) + \
+            ''.join([stickers[pos][code] for pos, code in enumerate(state)])
 
     def cube_move(self, move: str, printrepr=False) -> None:
-        moveindex = {
-            'R': (1, 3, 5, 7, 10, 13, 15, 18),
-            'L': (0, 2, 4, 6, 8, 12, 14, 16),
-            'U': (0, 1, 2, 3, 8, 9, 10, 11),
-            'D': (4, 5, 6, 7, 16, 17, 18, 19),
-            'B': (0, 1, 4, 5, 9, 12, 13, 17),
-            'F': (2, 3, 6, 7, 11, 14, 15, 19)
-        }
-        # normal moves
-        if move[0] in moveindex:
-            positions = moveindex[move[0]]
-            _generic_cube_move(self, positions, move)
-
-        # axis moves
-        elif move[0] in 'xyz':
-            if move.endswith('2'):
-                self._axis_move(move[0])
-                self._axis_move(move[0])
-            else:
-                self._axis_move(move)
-
-        elif move[0] in 'MES':
-            if move.endswith('2'):
-                self._special_move(move[0])
-                self._special_move(move[0])
-            else:
-                self._special_move(move)
+        # face turns, rotations and slice moves are all a single table lookup
+        if move in cubie.MOVES:
+            self._apply(cubie.MOVES[move])
+            if self._recording is not None:
+                self._recording.append(move)
 
         if printrepr:
             print('\nMove: {}'.format(move))
             print(repr(self))
 
-    def _axis_move(self, move: str):
-        if move.endswith('p') or move.endswith("'"):
-            clockwise = False
+    def _apply(self, move: cubie.Move) -> None:
+        self._state = cubie.apply(self._state, move)
+        self._where = self._where.translate(move.locations)
+        if move.centres is not None:
+            centres = self._centres
+            self._centres = tuple([centres[face] for face in move.centres])
 
-        else:
-            clockwise = True
+    def _set_state(self, state: bytes) -> None:
+        """replace the state outright, keeping the centres"""
+        self._state = state
+        self._where = cubie.locate(state)
 
-        moveindex = {
-            'x': ('top', 'right', 'bottom', 'left'),
-            'y': ('front', 'left', 'back', 'right'),
-            'z': ('front', 'top', 'back', 'bottom')
-        }
+    def reference(self) -> 'SolvedCube':
+        """the solved cube with the same centres, for the solvers to compare against"""
+        if self._stats is not None:
+            self._stats.current.references += 1
 
-        orientation_index = {
-            'x': (0, 1, 2),
-            'y': (1, 0, 2),
-            'z': (2, 1, 0)
-        }
-        _generic_axis_colours(self, moveindex[move[0]], clockwise)
-        _axis_move_positions(self, move, clockwise)
-
-        for piece in self.cube:
-            temp = orientation_index[move[0]]
-            constant, switch1, switch2 = temp[0], temp[1], temp[2]
-            _generic_orientation_move(piece, constant, switch1, switch2)
-
-    # for moves that are really just combinations of other moves; like M, S, E and their primes
-    def _special_move(self, move: str) -> None:
-        if move == 'M':
-            self.perform_algorithm('R Lp zp')
-        elif move == 'Mp' or move == "M'":
-            self.perform_algorithm('Rp L z')
-
-        elif move == 'E':
-            self.perform_algorithm('U Dp yp')
-        elif move == 'Ep' or move == "E'":
-            self.perform_algorithm('Up D y')
-
-        elif move == 'S':
-            self.perform_algorithm('Fp B x')
-        elif move == 'Sp' or move == "S'":
-            self.perform_algorithm('F Bp xp')
+        return solved(self.front, self.right, self.top)
 
     # find piece position in cube
     def find_piece(self, piece: Piece) -> int:
-        for cubie in self.cube:
-            flag = True
-            for colour in piece.orientation:
-                if colour not in cubie:
-                    flag = False
-
-            if flag:
-                return cubie.pos
-
-    def scramble(self, nummoves=100, printrepr=True) -> None:
-        scramble_algo = generate_scramble(nummoves)
-        before = self.define()
-
-        if printrepr:
+        label = _label_table(self._palette).get(frozenset(piece.orientation))
+        if label is not None:
+            return self._where[label] // 3
+
+    def scramble(self, nummoves=100, printrepr=True, seed: scramble.Seed = None, random_state=False,
+                 min_distance=0) -> None:
+        """Perform nummoves random face turns, or with random_state jump straight to a uniformly random state. Pass a
+        seed (or a random.Random) to get the same scramble every time, and a min_distance to skip scrambles that leave
+        the cube closer to solved than that by twophase.lower_bound (see scramble.py). The bound only rejects scrambles
+        that leave the cube nearly solved, not ones that are merely short."""
+        before = self.define() if tracelog.enabled() else ''
+        if random_state:
+            scramble_algo = ''
+            # the state is drawn against _palette, so turn it to however the cube is held now
+            state = scramble.random_state(seed, min_distance)
+            self._set_state(cubie.apply(state, cubie.ROTATIONS[cubie.rotation_between(self._palette, self._centres)]))
+            if printrepr:
+                print('Scramble: random state')
+                print(repr(self))
+
+        elif printrepr:
+            scramble_algo = generate_scramble(nummoves, seed, min_distance)
             print('Scramble: {}'.format(scramble_algo))
             self.perform_algorithm(scramble_algo, printrepr=True)
 
         else:
+            scramble_algo = generate_scramble(nummoves, seed, min_distance)
             self.perform_algorithm(scramble_algo)
 
-        after = self.define()
-        # TODO: REMOVE THIS FOR DEBUGGING PURPOSES ONLY
-        with open('scramblesShaker10.txt', 'a') as file:
-            file.write('{:^5}\tBefore: {:^60}\tAfter: {:^60}\n'.format(len(scramble_algo.split()), before, after))
+        if tracelog.enabled():
+            tracelog.emit('scramble', scramble_algo, before, self.define())
 
-    def solve(self, show_steps=False):
-        import F2L, OLL, PLL
-        if show_steps:
-            print('Cross: ')
-            F2L.cross(self)
-            print(repr(self))
+    def solve(self, show_steps=False, method='layers', max_length=22, timeout=10.0,
+              stats: 'solvestats.SolveStats' = None, cache: 'solutioncache.SolutionCache' = None) -> str:
+        """Solve the cube, returning the moves performed once simplified. method is either 'layers' for the layer by
+        layer method, or 'twophase' for the two-phase solver: it stops at the first solution of at most max_length
+        moves, or at the shortest one found once timeout seconds have passed. Pass a solvestats.SolveStats as stats to
+        have it filled in with what every phase of the solve did, and a solutioncache.SolutionCache as cache to look
+        the solution up there first and store it there otherwise."""
+        import F2L, OLL, PLL, simplify, solvestats
+        key = cached = None
+        if cache is not None:
+            key = cache.key(self, method if method == 'layers' else '{}/{}'.format(method, max_length))
+            cached = cache.get(key)
 
-            print('Corners: ')
-            F2L.corners(self)
-            print(repr(self))
+        if cached is not None:
+            phases = (('Cache', lambda cubeobj: cubeobj.perform_algorithm(cached)),)
 
-            print('Second layer: \n')
-            F2L.edges(self)
-            print(repr(self))
+        elif method == 'twophase':
+            phases = (('Two-phase', lambda cubeobj: cubeobj._solve_twophase(max_length, timeout)),)
 
-            print('OLL: \n')
-            OLL.oll(self)
-            print(repr(self))
+        elif method == 'layers':
+            phases = (('Cross', F2L.cross), ('Corners', F2L.corners), ('Second layer', F2L.edges), ('OLL', OLL.oll),
+                      ('PLL', PLL.pll))
 
-            print('PLL: \n')
-            PLL.pll(self)
-            print(repr(self))
+        else:
+            raise ValueError('Unknown solving method {}'.format(method))
+
+        self._recording = []
+        self._stats = stats
+        timer = stats if stats is not None else solvestats.SolveStats()
+        try:
+            for name, phase in phases:
+                if show_steps:
+                    print('{}: '.format(name))
+
+                with timer.phase(name.lower(), self._recording):
+                    phase(self)
+
+                if show_steps:
+                    print(repr(self))
+
+        finally:
+            moves, self._recording, self._stats = self._recording, None, None
+
+        # a cached solution was simplified before it was stored
+        solution = cached.split() if cached is not None else simplify.simplify(moves)
+        timer.solution = len(solution)
+        if key is not None and cached is None:
+            cache.put(key, ' '.join(solution))
+
+        return ' '.join(solution)
+
+    def _solve_twophase(self, max_length: int, timeout: float) -> None:
+        import twophase
+        # pieces of a freshly built cube are labelled against its current centres, as twophase expects
+        self.perform_algorithm(' '.join(twophase.solve(build(self.define())._state, max_length, timeout)))
+
+    def perform_algorithm(self, moves: Union[str, 'Algorithm'], printrepr=False, verbose=False) -> None:
+        algorithm = moves if isinstance(moves, Algorithm) else compile_algo(moves)
+        if verbose and sys.stdout.isatty():
+            # redraw the net in place, only the stickers each move changed
+            view = render.TerminalView()
+            print()
+            for move in algorithm.moves:
+                self.cube_move(move)
+                view.draw(self, 'Move: {}'.format(move))
+
+        elif verbose:
+            for move in algorithm.moves:
+                self.cube_move(move, printrepr=True)
 
         else:
-            F2L.f2l(self)
-            OLL.oll(self)
-            PLL.pll(self)
+            self._apply(algorithm.move)
+            if self._recording is not None:
+                self._recording.extend(algorithm.moves)
+
+        if printrepr and not verbose and not algorithm.halted:
+            print(repr(self))
+
+    def define(self) -> str:
+        return facelets.to_definition(self._state, self._palette, self._centres)
 
-            # print(repr(self))
 
-    def perform_algorithm(self, moves: str, printrepr=False, verbose=False) -> None:
+class Algorithm:
+    """A validated sequence of moves, fused into a single move table so it can be performed in one step. Moves after
+    a 'q' are dropped, as perform_algorithm always has."""
+    def __init__(self, moves: str):
         moves = validate_algo(moves)
-        for move in moves:
-            if move == 'q':
-                return
+        self.halted = 'q' in moves
+        if self.halted:
+            moves = moves[:moves.index('q')]
 
-            else:
-                self.cube_move(move, printrepr=verbose)
+        self.moves = tuple(moves)
+        self.move = cubie.IDENTITY
+        for move in self.moves:
+            self.move = cubie.compose(self.move, cubie.MOVES[move])
 
-        if printrepr and not verbose:
-            print(repr(self))
+    def __len__(self):
+        return len(self.moves)
 
-    def define(self) -> str:
-        sides = _get_sidedict(self)
-        for side in sides:
-            newside = ''
-            for row in sides[side]:
-                for piece in row:
-                    if isinstance(piece, str):
-                        newside += piece
-                        continue
+    def __str__(self):
+        return ' '.join(self.moves)
+
+    def __repr__(self):
+        return 'Algorithm({!r})'.format(str(self))
 
-                    if side in '{}{}'.format(self.top, self.bottom):
-                        newside += self[piece][1]
 
-                    elif side in '{}{}'.format(self.front, self.back):
-                        newside += self[piece][0]
+class SolvedCube(Cube):
+    """A solved cube that refuses to be moved, used by the solvers as a reference. Get one through solved() rather
+    than building it, so that each colour scheme is only ever built once."""
+    def __init__(self, front='green', right='red', top='white'):
+        super().__init__(front, right, top)
+        # home position of every piece, keyed by its set of colours
+        self._homes = {frozenset(self._colours[pos][code]): pos for pos, code in enumerate(self._state)}
+
+    def _apply(self, move: cubie.Move) -> None:
+        raise TypeError('A solved reference cube cannot be moved, build a Cube instead')
+
+    def _set_state(self, state: bytes) -> None:
+        raise TypeError('A solved reference cube cannot be moved, build a Cube instead')
+
+    def find_piece(self, piece: Piece) -> int:
+        return self._homes.get(frozenset(piece.orientation))
+
 
-                    else:
-                        newside += self[piece][2]
-            sides[side] = newside
+def solved(front='green', right='red', top='white') -> SolvedCube:
+    return _solved(front[0].lower(), right[0].lower(), top[0].lower())
 
-        definition = sides[self.top] + sides[self.front] + sides[self.right] + sides[self.back] + sides[self.left] + \
-                     sides[self.bottom]
 
-        return definition
+@lru_cache(maxsize=None)
+def _solved(front: str, right: str, top: str) -> SolvedCube:
+    return SolvedCube(front, right, top)
 
 
 def take_moves_input() -> str:
@@ -500,120 +404,55 @@ def validate_algo(moves: str) -> List[str]:
     return output
 
 
-def generate_scramble(nummoves: int = 100) -> str:
-    global validmoves
-    moves = [move for move in validmoves if not move.endswith('p')]
-    scramble_algo = []
-
-    for _ in range(nummoves):
-        scramble_algo.append(random.choice(moves))
-
-    scramble_algo = ' '.join(scramble_algo)
-
-    return scramble_algo
-
-
-def _generic_axis_colours(cubeobj: Cube, sides: Tuple[str, str, str, str], clockwise=True) -> None:
-    clockwise_transformations = {
-        sides[0]: sides[1],
-        sides[1]: sides[2],
-        sides[2]: sides[3],
-        sides[3]: sides[0]
-    }
-    anti_clockwise = invert_dict(clockwise_transformations)
-
-    if clockwise:
-        old_colours = [getattr(cubeobj, side) for side in clockwise_transformations]
-        colouridx = 0
-        for side in clockwise_transformations:
-            setattr(cubeobj, clockwise_transformations[side], old_colours[colouridx])
-            colouridx += 1
-
-    else:
-        old_colours = [getattr(cubeobj, side) for side in anti_clockwise]
-        colouridx = 0
-        for side in anti_clockwise:
-            setattr(cubeobj, anti_clockwise[side], old_colours[colouridx])
-            colouridx += 1
-
-    return
-
+def compile_algo(moves: str) -> Algorithm:
+    algorithm = _compiled(moves)
+    # strings with unrecognised moves are parsed again every time, so that every time warns about them
+    return algorithm if algorithm is not None else Algorithm(moves)
 
-def _axis_move_positions(cubeobj: Cube, move: str, clockwise):
-    transformation_idx = {
-        'x': {
-            0: 1, 1: 5, 2: 3, 3: 7, 4: 0, 5: 4, 6: 2, 7: 6,
-            8: 10, 9: 13, 10: 18, 11: 15, 12: 9, 13: 17, 14: 11, 15: 19, 16: 8, 17: 12, 18: 16, 19: 14},
 
-        'y': {0: 1, 1: 3, 3: 2, 2: 0, 4: 5, 5: 7, 7: 6, 6: 4,
-              8: 9, 9: 10, 10: 11, 11: 8, 12: 13, 13: 15, 15: 14, 14: 12, 16: 17, 17: 18, 18: 19, 19: 16},
+# the solvers perform the same few algorithms over and over, so each string is only parsed and fused once
+@lru_cache(maxsize=1024)
+def _compiled(moves: str) -> Union[Algorithm, None]:
+    known = set(validmoves + ['q'])
+    if all(move in known for move in moves.split()):
+        return Algorithm(moves)
 
-        'z': {0: 4, 1: 5, 2: 0, 3: 1, 4: 6, 5: 7, 6: 2, 7: 3,
-              8: 12, 9: 17, 10: 13, 11: 9, 12: 16, 13: 18, 14: 8, 15: 10, 16: 14, 17: 19, 18: 15, 19: 11}
 
-    }
-
-    if clockwise:
-        for piece in cubeobj.cube:
-            piece.pos = transformation_idx[move[0]][piece.pos]
-
-    else:
-        anti_clockwise = invert_dict(transformation_idx[move[0]])
-        for piece in cubeobj.cube:
-            piece.pos = anti_clockwise[piece.pos]
+compile_algo.cache_clear = _compiled.cache_clear
 
-    _reorder_positions(cubeobj)
 
-    return
+def generate_scramble(nummoves: int = 100, seed: scramble.Seed = None, min_distance: int = 0) -> str:
+    return ' '.join(scramble.random_moves(nummoves, seed, min_distance))
 
 
-def _generic_cube_move(cubeobj: Cube, positions: tuple, move: str):
-    # execute moves
-    for piece in positions:
-        piece = cubeobj.cube[piece]
-        piece.piece_move(move)
+@lru_cache(maxsize=None)
+def _colour_table(palette: Tuple[str, ...]) -> tuple:
+    """colours on the x, y and z axes for every (position, code) pair, given the centres pieces were labelled by"""
+    return tuple(
+        tuple(None if faces is None else tuple(None if face is None else palette[face] for face in faces)
+              for faces in position)
+        for position in cubie.FACELET_FACES
+    )
 
-    # reorder positions
-    _reorder_positions(cubeobj)
 
+@lru_cache(maxsize=None)
+def _label_table(palette: Tuple[str, ...]) -> dict:
+    """piece label of every set of colours"""
+    return {frozenset(position[label * 3]): label for label, position in enumerate(_colour_table(palette))}
 
-def _reorder_positions(cubeobj: Cube):
-    temp = [0] * 20
-    for piece in cubeobj.cube:
-        temp[piece.pos] = piece
 
-    cubeobj.cube = temp[:]
-    return
+@lru_cache(maxsize=None)
+def _sticker_table(palette: Tuple[str, ...]) -> tuple:
+    """colours of every (position, code) pair as a string, x then y then z"""
+    return tuple(
+        tuple(None if colours is None else ''.join([colour for colour in colours if colour]) for colours in position)
+        for position in _colour_table(palette)
+    )
 
 
-# to transform position of piece: there is a cycle of 4 positions for any side
-def _generic_pos_move(piece: Piece, pos1: int, pos2: int, pos3: int, pos4: int, clockwise=True) -> None:
-    clockwise_transformations = {
-        pos1: pos2,
-        pos2: pos3,
-        pos3: pos4,
-        pos4: pos1
-    }
-    anti_clockwise = invert_dict(clockwise_transformations)
-
-    if clockwise:
-        piece.pos = clockwise_transformations[piece.pos]
-
-    else:
-        piece.pos = anti_clockwise[piece.pos]
-
-
-# for each move, the colour on one axis remains the same, while the two other axes switch
-def _generic_orientation_move(piece: Piece, constantidx: int, switch1: int, switch2: int) -> None:
-    """takes Piece and three integers representing the constant axis and the other two to be switched
-    0: x; 1: y, 2: z"""
-
-    output = [0, 0, 0]
-    output[constantidx] = piece.orientation[constantidx]
-    output[switch1] = piece.orientation[switch2]
-    output[switch2] = piece.orientation[switch1]
-
-    piece.orientation = tuple(output)
+@lru_cache(maxsize=None)
+def _canonical_rotation(centres: Tuple[str, ...]) -> cubie.Move:
+    return min(cubie.ROTATIONS, key=lambda rotation: [centres[face] for face in rotation.centres])
 
 
 def _generate_positions(cubeobj: Cube) -> dict:
@@ -643,56 +482,6 @@ def _generate_positions(cubeobj: Cube) -> dict:
     return positions
 
 
-def _get_sidedict(cubeobj: Cube) -> dict:
-    sides = {
-        cubeobj.top: ((0, 9, 1), (8, cubeobj.top, 10), (2, 11, 3)),
-        cubeobj.bottom: ((6, 19, 7), (16, cubeobj.bottom, 18), (4, 17, 5)),
-        cubeobj.left: ((0, 8, 2), (12, cubeobj.left, 14), (4, 16, 6)),
-        cubeobj.right: ((3, 10, 1), (15, cubeobj.right, 13), (7, 18, 5)),
-        cubeobj.back: ((1, 9, 0), (13, cubeobj.back, 12), (5, 17, 4)),
-        cubeobj.front: ((2, 11, 3), (14, cubeobj.front, 15), (6, 19, 7))
-    }
-    return sides
-
-
-def _generate_sides(cubeobj: Cube) -> dict:
-    c = cubeobj.cube
-    # helper lambdas to retrieve x, y, and z colours of Piece object
-    x = lambda g: g.orientation[0]
-    y = lambda g: g.orientation[1]
-    z = lambda g: g.orientation[2]
-
-    sides = _get_sidedict(cubeobj)
-
-    for side in sides:
-        temp = []
-        for row in sides[side]:
-            temprow = []
-            for piece in row:
-                if not isinstance(piece, int):
-                    temprow.append(Square(piece))
-                    continue
-                # get colour at y axis if side is top or bottom
-                if side in '{}{}'.format(cubeobj.top, cubeobj.bottom):
-                    temprow.append(Square(y(c[piece])))
-
-                # get colour at z axis if side is left or right
-                elif side in '{}{}'.format(cubeobj.left, cubeobj.right):
-                    temprow.append(Square(z(c[piece])))
-
-                # get colour at x axis if side is front or back
-                else:
-                    temprow.append(Square(x(c[piece])))
-
-            # add row to full side when row is done
-            temp.append(temprow)
-
-        # update side once processing finished
-        sides[side] = temp
-
-    return sides
-
-
 def tutorial():
     print('Welcome to Cube! This is a tutorial to help you get started..')
     print('To start, create a cube object like so... cube.Cube()')
@@ -715,44 +504,28 @@ def build(cubedef: NoneStr = None) -> Cube:
     each face is 9 letters representing the colours on that face. The face should be read from top left to bottom right
     """
 
-    # positions to tuple dict consisting of the index at which to find the appropriate colour in the definition string
     if cubedef is None:
         cubedef = _gui_build()
 
-    try:
-        cubedef = cubedef.lower()
-
-    except AttributeError:
+    if not isinstance(cubedef, str):
         return
 
-    pos_to_index = {
-        0: (29, 0, 36), 1: (27, 2, 20), 2: (9, 6, 38), 3: (11, 8, 18), 4: (35, 51, 42), 5: (33, 53, 26),
-        6: (15, 45, 44), 7: (17, 47, 24), 8: (None, 3, 37), 9: (28, 1, None), 10: (None, 5, 19), 11: (10, 7, None),
-        12: (32, None, 39), 13: (30, None, 23), 14: (12, None, 41), 15: (14, None, 21), 16: (None, 48, 43),
-        17: (34, 52, None), 18: (None, 50, 25), 19: (16, 46, None)
-    }
+    return from_state(*validate.read(cubedef))
+
 
+def from_state(state: bytes, palette: Tuple[str, ...] = None, centres: Tuple[str, ...] = None) -> Cube:
+    """cube in the given cubie state, its pieces labelled against palette (centres in cubie.FACES order; white top and
+    green front by default) and with the given centres (palette by default)"""
     cubeobj = Cube()
-    cubeobj.top, cubeobj.front, cubeobj.right = cubedef[4], cubedef[13], cubedef[22]
-    cubeobj.back, cubeobj.left, cubeobj.bottom = cubedef[31], cubedef[40], cubedef[49]
-
-    corners = []
-    for pos in pos_to_index:
-        if pos > 7:
-            break
-        colours = pos_to_index[pos]
-        corners.append(Corner(pos, cubedef[colours[0]], cubedef[colours[1]], cubedef[colours[2]]))
-
-    edges = []
-    for pos in pos_to_index:
-        if pos < 8:
-            continue
-
-        colours = pos_to_index[pos]
-        x, y, z = [cubedef[colours[idx]] if colours[idx] else colours[idx] for idx in range(3)]
-        edges.append(Edge(pos, x, y, z))
-
-    cubeobj.cube = corners + edges
+    if palette is not None:
+        cubeobj._centres = cubeobj._palette = palette
+        cubeobj._colours = _colour_table(palette)
+
+    if centres is not None:
+        cubeobj._centres = centres
+
+    cubeobj._state = state
+    cubeobj._where = cubie.locate(state)
     return cubeobj
 
 
@@ -0,0 +1,184 @@
+"""Many cubes moved together.
+
+A CubeBatch holds the cubie states (see cubie.py) of N cubes packed end to end in one bytes object, 20 bytes per cube.
+All the cubes share a colour scheme and are turned together, so they always show the same centres. A move then costs
+20 strided slices and translations whatever N is: position ``dst`` of every cube is ``states[src::20]`` run through
+the move's translation for that position. An algorithm is fused into a single move first (see cube.Algorithm), so
+trying an algorithm across a million scrambles is 20 byte operations over the whole batch.
+
+    batch = CubeBatch.random(100000, seed=1)
+    batch.apply("R U R' U'")
+    print(sum(batch.is_solved()))
+"""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+import cube, cubie, facelets, scramble, validate
+
+STATE_LENGTH = facelets.STATE_LENGTH
+
+
+class CubeBatch:
+    def __init__(self, states: bytes = b'', palette: Optional[Tuple[str, ...]] = None,
+                 centres: Optional[Tuple[str, ...]] = None):
+        """states packed end to end, their pieces labelled against palette (centres in cubie.FACES order, white top
+        and green front by default), the cubes showing centres (palette by default)"""
+        if len(states) % STATE_LENGTH:
+            raise ValueError('Batch states must be 20 bytes each')
+
+        self._states = bytes(states)
+        self._palette = palette or cube.solved()._palette
+        self._centres = centres or self._palette
+
+    @classmethod
+    def solved(cls, count: int, front='green', right='red', top='white') -> 'CubeBatch':
+        cubeobj = cube.solved(front, right, top)
+        return cls(cubie.SOLVED * count, cubeobj._palette)
+
+    @classmethod
+    def random(cls, count: int, seed: scramble.Seed = None, nummoves: Optional[int] = None) -> 'CubeBatch':
+        """count uniformly random cubes, or with nummoves cubes scrambled by that many random face turns"""
+        if nummoves is None:
+            return cls(b''.join(scramble.states(count, seed)))
+
+        return cls(b''.join(scramble.scrambled_states(count, nummoves, seed)))
+
+    @classmethod
+    def from_definitions(cls, definitions: Iterable[str]) -> 'CubeBatch':
+        """batch of cube definitions (see cube.build), which must all have the same centres and be solvable"""
+        packed = facelets.pack(definitions)
+        if not packed:
+            return cls()
+
+        palette = facelets.palette_of(packed[:facelets.DEFINITION_LENGTH].decode('ascii'))
+        batch = cls(facelets.to_states(packed, palette), palette)
+        for definition, problem in zip(facelets.unpack(packed), batch.problems()):
+            if problem is not None:
+                # go through the definition again for the full message
+                validate.read(definition)
+
+        return batch
+
+    @classmethod
+    def from_cubes(cls, cubes: Iterable[cube.Cube]) -> 'CubeBatch':
+        """batch of cubes, which must all show the same centres"""
+        cubes = list(cubes)
+        if not cubes:
+            return cls()
+
+        palette, centres = cubes[0]._palette, cubes[0]._centres
+        if any(cubeobj._centres != centres for cubeobj in cubes):
+            raise ValueError('Cubes in a batch must all show the same centres')
+
+        # cubes built from different definitions may label their pieces against different centres: read them again
+        if any(cubeobj._palette != palette for cubeobj in cubes):
+            return cls.from_definitions(cubeobj.define() for cubeobj in cubes)
+
+        return cls(b''.join(cubeobj._state for cubeobj in cubes), palette, centres)
+
+    @property
+    def states(self) -> bytes:
+        return self._states
+
+    @property
+    def centres(self) -> Tuple[str, ...]:
+        return self._centres
+
+    def __len__(self) -> int:
+        return len(self._states) // STATE_LENGTH
+
+    def __getitem__(self, item: int) -> cube.Cube:
+        if item < 0:
+            item += len(self)
+
+        if not 0 <= item < len(self):
+            raise IndexError('CubeBatch index out of range')
+
+        state = self._states[item * STATE_LENGTH:(item + 1) * STATE_LENGTH]
+        return cube.from_state(state, self._palette, self._centres)
+
+    def __iter__(self) -> Iterator[cube.Cube]:
+        for item in range(len(self)):
+            yield self[item]
+
+    def __repr__(self) -> str:
+        return 'CubeBatch({} cubes, centres {})'.format(len(self), ''.join(self._centres))
+
+    def copy(self) -> 'CubeBatch':
+        return CubeBatch(self._states, self._palette, self._centres)
+
+    def apply(self, moves: Union[str, cube.Algorithm, cubie.Move]) -> None:
+        """perform moves (an algorithm string, a cube.Algorithm or a compiled cubie.Move) on every cube"""
+        if isinstance(moves, str):
+            moves = cube.compile_algo(moves)
+
+        move = moves.move if isinstance(moves, cube.Algorithm) else moves
+        states = self._states
+        moved = bytearray(len(states))
+        for dst, (src, translation) in enumerate(move.cubies):
+            moved[dst::STATE_LENGTH] = states[src::STATE_LENGTH].translate(translation)
+
+        self._states = bytes(moved)
+        if move.centres is not None:
+            centres = self._centres
+            self._centres = tuple([centres[face] for face in move.centres])
+
+    def define(self) -> List[str]:
+        """the cube definition (see cube.build) of every cube"""
+        return facelets.unpack(facelets.to_definitions(self._states, self._palette, self._centres))
+
+    def _matches(self, target: bytes) -> List[bool]:
+        """whether every cube is in the target state"""
+        count = len(self)
+        # 1 in every lane holding a cube that differs at a position, summed over the positions: no lane goes past 20
+        wrong = 0
+        for pos, code in enumerate(target):
+            table = bytearray([1] * 256)
+            table[code] = 0
+            wrong += int.from_bytes(self._states[pos::STATE_LENGTH].translate(table), 'big')
+
+        return [not lane for lane in wrong.to_bytes(count, 'big')]
+
+    def problems(self) -> List[Optional[str]]:
+        """why each cube cannot be solved (see validate.py), None for those that can"""
+        batch = self
+        if self._centres != self._palette:
+            # the pieces are labelled against the palette, so only check them once turned back to it
+            batch = self.copy()
+            batch.apply(cubie.ROTATIONS[cubie.rotation_between(self._centres, self._palette)])
+
+        return validate.state_problems(batch._states)
+
+    def is_solved(self) -> List[bool]:
+        # the cubes are all turned the same way, so they share the one solved state
+        rotation = cubie.ROTATIONS[cubie.rotation_between(self._palette, self._centres)]
+        return self._matches(cubie.apply(cubie.SOLVED, rotation))
+
+    def equal(self, other: 'CubeBatch') -> List[bool]:
+        """whether each cube has the same colouring as the cube at the same index of other, up to a whole cube
+        rotation, like Cube.__eq__"""
+        if len(other) != len(self):
+            raise ValueError('Cannot compare batches of {} and {} cubes'.format(len(self), len(other)))
+
+        rotation = cubie.rotation_between(other._centres, self._centres)
+        if rotation is None:
+            return [False] * len(self)
+
+        other = other.copy()
+        other.apply(cubie.ROTATIONS[rotation])
+        if other._palette == self._palette:
+            states, other_states = self._states, other._states
+            return [states[idx:idx + STATE_LENGTH] == other_states[idx:idx + STATE_LENGTH]
+                    for idx in range(0, len(states), STATE_LENGTH)]
+
+        length = facelets.DEFINITION_LENGTH
+        packed = facelets.to_definitions(self._states, self._palette, self._centres)
+        other_packed = facelets.to_definitions(other._states, other._palette, other._centres)
+        return [packed[idx:idx + length] == other_packed[idx:idx + length] for idx in range(0, len(packed), length)]
+
+    def __eq__(self, other):
+        if not isinstance(other, CubeBatch):
+            return NotImplemented
+
+        return len(self) == len(other) and all(self.equal(other))
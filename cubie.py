@@ -0,0 +1,335 @@
+"""Cubie-level cube state and precomputed move tables.
+
+A state is a ``bytes`` object of length 20, one entry per position (see rubikspositions.txt). Entry ``pos`` holds
+``piece * 3 + twist`` where ``piece`` is the home position of the cubie sitting there and ``twist`` its orientation:
+0-2 for corners and 0-1 for edges. A corner's twist is the index, in its position's reference cycle, of the axis
+holding the piece's top/bottom sticker; an edge's flip is defined the same way using the top/bottom sticker, or the
+front/back sticker for middle layer edges.
+
+Every move is compiled once into a ``Move``: for each destination position, the source position and a translation
+table (in ``bytes.translate`` form) of the source code. Applying a move is therefore a single pass over 20 bytes.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# axes follow the Piece.orientation convention: 0: x (front/back), 1: y (top/bottom), 2: z (left/right)
+# faces follow the cube definition string order: U F R B L D
+FACES = ('top', 'front', 'right', 'back', 'left', 'bottom')
+TOP, FRONT, RIGHT, BACK, LEFT, BOTTOM = range(6)
+
+# face seen on each axis by each position when solved, None where an edge has no sticker
+HOME_FACES = (
+    (BACK, TOP, LEFT), (BACK, TOP, RIGHT), (FRONT, TOP, LEFT), (FRONT, TOP, RIGHT),
+    (BACK, BOTTOM, LEFT), (BACK, BOTTOM, RIGHT), (FRONT, BOTTOM, LEFT), (FRONT, BOTTOM, RIGHT),
+    (None, TOP, LEFT), (BACK, TOP, None), (None, TOP, RIGHT), (FRONT, TOP, None),
+    (BACK, None, LEFT), (BACK, None, RIGHT), (FRONT, None, LEFT), (FRONT, None, RIGHT),
+    (None, BOTTOM, LEFT), (BACK, BOTTOM, None), (None, BOTTOM, RIGHT), (FRONT, BOTTOM, None)
+)
+
+# positions cycled by a clockwise quarter turn of each face
+FACE_CYCLES = {
+    'R': ((1, 5, 7, 3), (10, 13, 18, 15)),
+    'L': ((0, 2, 6, 4), (8, 14, 16, 12)),
+    'U': ((0, 1, 3, 2), (8, 9, 10, 11)),
+    'D': ((4, 6, 7, 5), (16, 19, 18, 17)),
+    'B': ((0, 4, 5, 1), (9, 12, 17, 13)),
+    'F': ((2, 3, 7, 6), (11, 15, 19, 14))
+}
+
+# axis left untouched by a quarter turn of each face, followed by the two axes whose stickers swap
+FACE_SWAPS = {
+    'R': (2, 0, 1),
+    'L': (2, 0, 1),
+    'U': (1, 0, 2),
+    'D': (1, 0, 2),
+    'B': (0, 2, 1),
+    'F': (0, 2, 1)
+}
+
+# destination of every position under a clockwise whole cube rotation
+ROTATION_MAPS = {
+    'x': {0: 1, 1: 5, 2: 3, 3: 7, 4: 0, 5: 4, 6: 2, 7: 6,
+          8: 10, 9: 13, 10: 18, 11: 15, 12: 9, 13: 17, 14: 11, 15: 19, 16: 8, 17: 12, 18: 16, 19: 14},
+
+    'y': {0: 1, 1: 3, 3: 2, 2: 0, 4: 5, 5: 7, 7: 6, 6: 4,
+          8: 9, 9: 10, 10: 11, 11: 8, 12: 13, 13: 15, 15: 14, 14: 12, 16: 17, 17: 18, 18: 19, 19: 16},
+
+    'z': {0: 4, 1: 5, 2: 0, 3: 1, 4: 6, 5: 7, 6: 2, 7: 3,
+          8: 12, 9: 17, 10: 13, 11: 9, 12: 16, 13: 18, 14: 8, 15: 10, 16: 14, 17: 19, 18: 15, 19: 11}
+}
+
+ROTATION_SWAPS = {
+    'x': (0, 1, 2),
+    'y': (1, 0, 2),
+    'z': (2, 1, 0)
+}
+
+# centre colours cycled by a clockwise whole cube rotation, each face passing its colour to the next
+ROTATION_CENTRES = {
+    'x': (TOP, RIGHT, BOTTOM, LEFT),
+    'y': (FRONT, LEFT, BACK, RIGHT),
+    'z': (FRONT, TOP, BACK, BOTTOM)
+}
+
+
+# slice moves as the face turns and rotation they are equivalent to
+SLICES = {
+    'M': ('R', 'Lp', 'zp'),
+    'Mp': ('Rp', 'L', 'z'),
+    'E': ('U', 'Dp', 'yp'),
+    'Ep': ('Up', 'D', 'y'),
+    'S': ('Fp', 'B', 'x'),
+    'Sp': ('F', 'Bp', 'xp')
+}
+
+# wide (two layer) moves as the face turn and slice move they are made of
+WIDES = {
+    'r': ('R', 'Mp'),
+    'l': ('L', 'M'),
+    'u': ('U', 'Ep'),
+    'd': ('D', 'E'),
+    'f': ('F', 'S'),
+    'b': ('B', 'Sp')
+}
+
+
+class Move(NamedTuple):
+    # (source position, code translation) for every destination position
+    cubies: Tuple[Tuple[int, bytes], ...]
+    # source face of every centre colour, None when the centres stay put
+    centres: Optional[Tuple[int, ...]]
+    # translation of pos * 3 + twist before the move to pos * 3 + twist after it, for locate() indexes
+    locations: bytes
+
+
+def _reference_cycle(pos: int) -> Tuple[int, ...]:
+    """axes of a position in twist order; corners go round clockwise so that every move preserves the cycle"""
+    faces = HOME_FACES[pos]
+    if pos >= 8:
+        return tuple(axis for axis in (1, 0, 2) if faces[axis] is not None)
+
+    # +1 for front, top and right; the handedness of the corner decides the direction of its cycle
+    signs = [1 if face in (FRONT, TOP, RIGHT) else -1 for face in faces]
+    return (1, 2, 0) if signs[0] * signs[1] * signs[2] > 0 else (1, 0, 2)
+
+
+CYCLES = tuple(_reference_cycle(pos) for pos in range(20))
+SOLVED = bytes(range(0, 60, 3))
+# shared by every position a move leaves alone, so compose() can skip them
+_UNCHANGED = bytes(range(256))
+IDENTITY = Move(tuple((pos, _UNCHANGED) for pos in range(20)), None, _UNCHANGED)
+
+
+def _physical_move(destinations: Dict[int, int], swap: Tuple[int, int, int],
+                   centres: Optional[Tuple[int, ...]] = None) -> Move:
+    """compile a move given where each moved position goes and which two axes swap stickers"""
+    constant, switch1, switch2 = swap
+    axis_map = {constant: constant, switch1: switch2, switch2: switch1}
+    sources = {dest: src for src, dest in destinations.items()}
+
+    cubies = []
+    for dest in range(20):
+        src = sources.get(dest, dest)
+        if dest not in sources:
+            cubies.append((src, _UNCHANGED))
+            continue
+
+        translation = bytearray(range(256))
+        size = len(CYCLES[src])
+        for piece in range(8) if src < 8 else range(8, 20):
+            for twist in range(size):
+                new_twist = CYCLES[dest].index(axis_map[CYCLES[src][twist]])
+                translation[piece * 3 + twist] = piece * 3 + new_twist
+
+        cubies.append((src, bytes(translation)))
+
+    locations = bytearray(range(256))
+    for dest, (src, translation) in enumerate(cubies):
+        for twist in range(len(CYCLES[src])):
+            locations[src * 3 + twist] = dest * 3 + translation[src * 3 + twist] % 3
+
+    return Move(tuple(cubies), centres, bytes(locations))
+
+
+def _cycle_map(cycle: Tuple[int, ...], clockwise: bool = True) -> Dict[int, int]:
+    step = 1 if clockwise else -1
+    return {cycle[idx]: cycle[(idx + step) % len(cycle)] for idx in range(len(cycle))}
+
+
+def _face_turn(face: str, clockwise: bool = True) -> Move:
+    corners, edges = FACE_CYCLES[face]
+    destinations = _cycle_map(corners, clockwise)
+    destinations.update(_cycle_map(edges, clockwise))
+    return _physical_move(destinations, FACE_SWAPS[face])
+
+
+def _rotation(axis: str, clockwise: bool = True) -> Move:
+    destinations = ROTATION_MAPS[axis]
+    if not clockwise:
+        destinations = {dest: src for src, dest in destinations.items()}
+
+    centres = list(range(6))
+    for dest, src in _cycle_map(ROTATION_CENTRES[axis], not clockwise).items():
+        centres[dest] = src
+
+    return _physical_move(destinations, ROTATION_SWAPS[axis], tuple(centres))
+
+
+def compose(first: Move, second: Move) -> Move:
+    """single move equivalent to performing first and then second"""
+    cubies = []
+    for src, translation in second.cubies:
+        first_src, first_translation = first.cubies[src]
+        if translation is _UNCHANGED:
+            cubies.append((first_src, first_translation))
+        elif first_translation is _UNCHANGED:
+            cubies.append((first_src, translation))
+        else:
+            cubies.append((first_src, first_translation.translate(translation)))
+
+    if first.centres is None or second.centres is None:
+        centres = first.centres if second.centres is None else second.centres
+    else:
+        centres = tuple(first.centres[src] for src in second.centres)
+
+    return Move(tuple(cubies), centres, first.locations.translate(second.locations))
+
+
+def apply(state: bytes, move: Move) -> bytes:
+    return bytes([translation[state[src]] for src, translation in move.cubies])
+
+
+def locate(state: bytes) -> bytes:
+    """Index of where every piece is: entry ``piece`` holds ``pos * 3 + twist``. Rather than being rebuilt, an index
+    can follow its state through a move with ``index.translate(move.locations)``."""
+    index = bytearray(20)
+    for pos, code in enumerate(state):
+        index[code // 3] = pos * 3 + code % 3
+
+    return bytes(index)
+
+
+def split(state: bytes) -> Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, ...], Tuple[int, ...]]:
+    """corner permutation, corner twists, edge permutation (0-11) and edge flips of a state"""
+    cp = tuple(code // 3 for code in state[:8])
+    co = tuple(code % 3 for code in state[:8])
+    ep = tuple(code // 3 - 8 for code in state[8:])
+    eo = tuple(code % 3 for code in state[8:])
+    return cp, co, ep, eo
+
+
+def parity(perm: Sequence[int]) -> int:
+    """0 for an even permutation, 1 for an odd one"""
+    odd, seen = 0, [False] * len(perm)
+    for start in range(len(perm)):
+        length = 0
+        while not seen[start]:
+            seen[start] = True
+            start = perm[start]
+            length += 1
+
+        if length:
+            odd ^= (length - 1) & 1
+
+    return odd
+
+
+def rank(perm: Sequence[int]) -> int:
+    """position of a permutation of range(n) in lexicographic order"""
+    value, size = 0, len(perm)
+    for idx, item in enumerate(perm):
+        value = value * (size - idx) + sum(1 for other in perm[idx + 1:] if other < item)
+
+    return value
+
+
+def unrank(value: int, size: int) -> List[int]:
+    """the permutation of range(size) at position value in lexicographic order"""
+    smaller = [0] * size
+    for idx in range(size - 1, -1, -1):
+        value, smaller[idx] = divmod(value, size - idx)
+
+    remaining = list(range(size))
+    return [remaining.pop(count) for count in smaller]
+
+
+def _build_moves() -> Dict[str, Move]:
+    moves = {}
+    for face in FACE_CYCLES:
+        clockwise, anticlockwise = _face_turn(face), _face_turn(face, False)
+        moves[face] = clockwise
+        moves[face + 'p'] = moves[face + "'"] = anticlockwise
+        moves[face + '2'] = compose(clockwise, clockwise)
+
+    for axis in ROTATION_MAPS:
+        moves[axis] = _rotation(axis)
+        moves[axis + 'p'] = moves[axis + "'"] = _rotation(axis, False)
+        moves[axis + '2'] = compose(moves[axis], moves[axis])
+
+    for name, sequence in SLICES.items():
+        first, second, rotation = (moves[move] for move in sequence)
+        moves[name] = compose(compose(first, second), rotation)
+
+    for name in 'MES':
+        moves[name + "'"] = moves[name + 'p']
+        moves[name + '2'] = compose(moves[name], moves[name])
+
+    for name, (face, slice_) in WIDES.items():
+        moves[name] = compose(moves[face], moves[slice_])
+        inverse = slice_[0] if slice_.endswith('p') else slice_ + 'p'
+        moves[name + 'p'] = moves[name + "'"] = compose(moves[face + 'p'], moves[inverse])
+        moves[name + '2'] = compose(moves[name], moves[name])
+
+    return moves
+
+
+MOVES = _build_moves()
+
+
+# the 24 whole cube rotations: one of six faces brought to the top, then one of four turns about it
+ROTATION_NAMES = tuple(' '.join(name for name in (top, turn) if name)
+                       for top in ('', 'x', 'x2', "x'", 'z', "z'") for turn in ('', 'y', 'y2', "y'"))
+
+
+def _rotations() -> Tuple[Move, ...]:
+    still = IDENTITY._replace(centres=tuple(range(6)))
+    rotations = []
+    for names in ROTATION_NAMES:
+        rotation = still
+        for name in names.split():
+            rotation = compose(rotation, MOVES[name])
+        rotations.append(rotation)
+
+    return tuple(rotations)
+
+
+ROTATIONS = _rotations()
+
+
+@lru_cache(maxsize=None)
+def rotation_between(centres: tuple, target: tuple) -> Optional[int]:
+    """index in ROTATIONS of the whole cube rotation turning a cube with centres (colours in FACES order) into one with
+    target centres, None if there is none"""
+    for idx, rotation in enumerate(ROTATIONS):
+        if tuple([centres[face] for face in rotation.centres]) == target:
+            return idx
+
+
+def _facelet_faces(pos: int, code: int) -> Tuple[Optional[int], ...]:
+    """home face of the sticker seen on each axis when the given code sits at the given position"""
+    piece, twist = divmod(code, 3)
+    here, home = CYCLES[pos], CYCLES[piece]
+    faces = [None, None, None]
+    for idx, axis in enumerate(here):
+        faces[axis] = HOME_FACES[piece][home[(idx - twist) % len(here)]]
+
+    return tuple(faces)
+
+
+# FACELET_FACES[pos][code] is only meaningful for codes a position can actually hold
+FACELET_FACES = tuple(
+    tuple(_facelet_faces(pos, code) if (code < 24) == (pos < 8) and code % 3 < len(CYCLES[pos]) else None
+          for code in range(60))
+    for pos in range(20)
+)
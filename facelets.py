@@ -0,0 +1,198 @@
+"""Conversion between cube definition strings (see cube.build) and cubie states (see cubie.py).
+
+Works on one cube at a time or on whole batches. A batch is packed end to end into one bytes object, 54 bytes per
+definition or 20 per state. Every facelet (or position) is then converted for the whole batch at once: the strided
+slice holding it in every cube goes through a single ``bytes.translate``. The cost per cube is a few C level byte
+operations rather than a pass of Python code.
+
+The pieces of a state are labelled against a palette: the centre colours, in cubie.FACES order, of the cube they were
+read from. Every definition in a batch must share the palette.
+"""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+import cubie
+
+# index in the definition string of the sticker on the x, y and z axes of every position, None where there is none
+FACELET_INDEX = (
+    (29, 0, 36), (27, 2, 20), (9, 6, 38), (11, 8, 18), (35, 51, 42), (33, 53, 26), (15, 45, 44), (17, 47, 24),
+    (None, 3, 37), (28, 1, None), (None, 5, 19), (10, 7, None), (32, None, 39), (30, None, 23), (12, None, 41),
+    (14, None, 21), (None, 48, 43), (34, 52, None), (None, 50, 25), (16, 46, None)
+)
+# index of the centre of every face, in cubie.FACES order
+CENTRE_INDEX = (4, 13, 22, 31, 40, 49)
+DEFINITION_LENGTH, STATE_LENGTH = 54, 20
+# faces are read as 0-5; anything else becomes INVALID
+INVALID = 6
+
+Palette = Tuple[str, ...]
+
+
+def _position_codes(pos: int) -> bytes:
+    """translation of the faces seen on a position, combined in base 6 in axis order, to the code showing them"""
+    table = bytearray([255] * 256)
+    for code, faces in enumerate(cubie.FACELET_FACES[pos]):
+        if faces is not None:
+            key = 0
+            for face in faces:
+                if face is not None:
+                    key = key * 6 + face
+            table[key] = code
+
+    return bytes(table)
+
+
+POSITION_CODES = tuple(_position_codes(pos) for pos in range(STATE_LENGTH))
+# translation of a code to its piece
+PIECES = bytes([code // 3 if code < 60 else 255 for code in range(256)])
+# the same tables next to the facelets each position's key is made from, for reading one definition at a time
+_CORNER_KEYS = tuple((POSITION_CODES[pos], *FACELET_INDEX[pos]) for pos in range(8))
+_EDGE_KEYS = tuple((POSITION_CODES[pos], *(idx for idx in FACELET_INDEX[pos] if idx is not None))
+                   for pos in range(8, STATE_LENGTH))
+
+
+@lru_cache(maxsize=None)
+def _face_table(palette: Palette) -> bytes:
+    """translation of a colour letter to the face of that colour"""
+    table = bytearray([INVALID] * 256)
+    for face, colour in enumerate(palette):
+        table[ord(colour)] = face
+
+    return bytes(table)
+
+
+@lru_cache(maxsize=None)
+def _sticker_tables(palette: Palette) -> tuple:
+    """for every facelet, the translation of the code at its position to the colour letter it shows"""
+    tables = [None] * DEFINITION_LENGTH
+    for pos, indices in enumerate(FACELET_INDEX):
+        for axis, idx in enumerate(indices):
+            if idx is not None:
+                table = bytearray(b'?' * 256)
+                for code, faces in enumerate(cubie.FACELET_FACES[pos]):
+                    if faces is not None:
+                        table[code] = ord(palette[faces[axis]])
+                tables[idx] = bytes(table)
+
+    return tuple(tables)
+
+
+def palette_of(definition: str) -> Palette:
+    return tuple(definition[idx] for idx in CENTRE_INDEX)
+
+
+def pack(definitions: Iterable[str]) -> bytes:
+    """definitions joined into one batch, lower cased"""
+    packed = ''.join(definitions).lower().encode('ascii', 'replace')
+    if len(packed) % DEFINITION_LENGTH:
+        raise ValueError('Cube definitions must be 54 letters long')
+
+    return packed
+
+
+def unpack(packed: bytes) -> List[str]:
+    return [packed[idx:idx + DEFINITION_LENGTH].decode('ascii') for idx in range(0, len(packed), DEFINITION_LENGTH)]
+
+
+def to_states(packed: bytes, palette: Optional[Palette] = None) -> bytes:
+    """States of a batch of definitions sharing palette (by default that of the first one), packed end to end.
+    Raises ValueError naming the first definition that is not a valid cube."""
+    count = len(packed) // DEFINITION_LENGTH
+    if count * DEFINITION_LENGTH != len(packed):
+        raise ValueError('Cube definitions must be 54 letters long')
+
+    if not count:
+        return b''
+
+    if palette is None:
+        palette = palette_of(packed[:DEFINITION_LENGTH].decode('ascii'))
+
+    faces = packed.translate(_face_table(palette))
+    valid = len(set(palette)) == 6 and INVALID not in faces and \
+        all(faces[idx::DEFINITION_LENGTH] == bytes([face]) * count for face, idx in enumerate(CENTRE_INDEX))
+
+    states = bytearray(STATE_LENGTH * count)
+    for pos, indices in enumerate(FACELET_INDEX):
+        if not valid:
+            break
+
+        # faces of every cube's facelets combined lane by lane: no lane goes past 215, so none carries into the next
+        key = 0
+        for idx in indices:
+            if idx is not None:
+                key = key * 6 + int.from_bytes(faces[idx::DEFINITION_LENGTH], 'big')
+
+        codes = key.to_bytes(count, 'big').translate(POSITION_CODES[pos])
+        valid = 255 not in codes
+        states[pos::STATE_LENGTH] = codes
+
+    if valid:
+        pieces = bytes(states).translate(PIECES)
+        valid = all(len(set(pieces[idx:idx + STATE_LENGTH])) == STATE_LENGTH
+                    for idx in range(0, len(pieces), STATE_LENGTH))
+
+    if not valid:
+        # go through the definitions one by one to say which is wrong and how
+        for definition in unpack(packed):
+            to_state(definition, palette)
+
+    return bytes(states)
+
+
+def to_definitions(states: bytes, palette: Palette, centres: Optional[Palette] = None) -> bytes:
+    """definitions of a batch of states labelled against palette, packed end to end; centres are the centre colours
+    of every cube, palette by default"""
+    count = len(states) // STATE_LENGTH
+    packed = bytearray(DEFINITION_LENGTH * count)
+    tables = _sticker_tables(palette)
+    for pos, indices in enumerate(FACELET_INDEX):
+        codes = states[pos::STATE_LENGTH]
+        for idx in indices:
+            if idx is not None:
+                packed[idx::DEFINITION_LENGTH] = codes.translate(tables[idx])
+
+    for colour, idx in zip(centres or palette, CENTRE_INDEX):
+        packed[idx::DEFINITION_LENGTH] = colour.encode('ascii') * count
+
+    return bytes(packed)
+
+
+def to_state(definition: str, palette: Optional[Palette] = None) -> Tuple[bytes, Palette]:
+    """state of a definition, and the palette its pieces are labelled against"""
+    definition = definition.lower()
+    if len(definition) != DEFINITION_LENGTH:
+        raise ValueError('Cube definition "{}" is not 54 letters long'.format(definition))
+
+    if palette is None:
+        palette = palette_of(definition)
+
+    if len(set(palette)) != 6:
+        raise ValueError('Cube definition "{}" does not have six distinct centres'.format(definition))
+
+    if palette_of(definition) != palette:
+        raise ValueError('Cube definition "{}" does not have the centres {}'.format(definition, ''.join(palette)))
+
+    faces = definition.encode('ascii', 'replace').translate(_face_table(palette))
+    if INVALID not in faces:
+        state = bytes([codes[faces[x] * 36 + faces[y] * 6 + faces[z]] for codes, x, y, z in _CORNER_KEYS] +
+                      [codes[faces[a] * 6 + faces[b]] for codes, a, b in _EDGE_KEYS])
+        if 255 not in state and len(set(state.translate(PIECES))) == STATE_LENGTH:
+            return state, palette
+
+    for pos, indices in enumerate(FACELET_INDEX):
+        key = 0
+        for idx in indices:
+            if idx is not None:
+                key = key * 6 + faces[idx]
+
+        if INVALID in (faces[idx] for idx in indices if idx is not None) or POSITION_CODES[pos][key] == 255:
+            colours = tuple(None if idx is None else definition[idx] for idx in indices)
+            raise ValueError('Cube definition "{}" has no piece {} at position {}'.format(definition, colours, pos))
+
+    raise ValueError('Cube definition "{}" repeats a piece'.format(definition))
+
+
+def to_definition(state: bytes, palette: Palette, centres: Optional[Palette] = None) -> str:
+    return to_definitions(state, palette, centres).decode('ascii')
@@ -0,0 +1,64 @@
+"""Last layer case tables, shared by OLL and PLL.
+
+A case table maps a key describing the last layer to the moves solving it in one go: a turn of the top layer, one
+algorithm and, for PLL, a final turn of the top layer. Rather than typing a key in for every algorithm, the table is
+worked out from what each algorithm does: the state an algorithm takes to solved is exactly the case it solves.
+"""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+from typing import Callable, Dict, Iterable, Tuple
+import cubie
+
+AUF = ('', 'U', 'U2', "U'")
+# positions of the top layer, corners then edges
+LAST_LAYER = (0, 1, 2, 3, 8, 9, 10, 11)
+# positions every last layer algorithm has to leave alone
+FIRST_LAYERS = tuple(range(4, 8)) + tuple(range(12, 20))
+
+Key = Tuple[int, ...]
+
+
+def _compile(moves: str) -> cubie.Move:
+    move = cubie.IDENTITY
+    for name in moves.split():
+        move = cubie.compose(move, cubie.MOVES[name])
+
+    return move
+
+
+def _solved_by(move: cubie.Move) -> bytes:
+    """the state move takes to solved"""
+    state = bytearray(20)
+    for dest, (src, translation) in enumerate(move.cubies):
+        state[src] = translation.index(dest * 3)
+
+    return bytes(state)
+
+
+def keeps_first_layers(move: cubie.Move) -> bool:
+    """whether move leaves the centres and the first two layers as they were"""
+    state = cubie.apply(cubie.SOLVED, move)
+    return (move.centres is None or move.centres == tuple(range(6))) and \
+        all(state[pos] == cubie.SOLVED[pos] for pos in FIRST_LAYERS)
+
+
+def case_table(algorithms: Iterable[str], key: Callable[[bytes], Key], final_turns=('',)) -> Dict[Key, str]:
+    """key of the case every algorithm solves after each turn of the top layer, and followed by each of final_turns,
+    mapped to the shortest such moves"""
+    turns = {turn: _compile(turn) for turn in AUF + tuple(final_turns)}
+    table = {}
+    # no algorithm at all covers the cases only a turn of the top layer away from solved
+    for algorithm in ('',) + tuple(algorithms):
+        compiled = _compile(algorithm)
+        if not keeps_first_layers(compiled):
+            raise ValueError('Algorithm "{}" disturbs the first two layers'.format(algorithm))
+
+        for turn in AUF:
+            for final_turn in final_turns:
+                case = key(_solved_by(cubie.compose(cubie.compose(turns[turn], compiled), turns[final_turn])))
+                moves = ' '.join(part for part in (turn, algorithm, final_turn) if part)
+                if case not in table or len(moves.split()) < len(table[case].split()):
+                    table[case] = moves
+
+    return table
@@ -0,0 +1,122 @@
+"""Drawing cubes as an unfolded net, as text ([w] cells) or as ANSI coloured blocks.
+
+The net is drawn straight from the definition string (see facelets.py): every cell of the net is a fixed index into
+the definition, so a drawing is one str.format of the 54 colour letters into a template of the net followed by one
+str.translate of every letter into its cell. Drawings are cached by state, so printing a cube that has not moved
+costs nothing.
+
+TerminalView goes further for step by step replays in a terminal: once the net is on screen it only rewrites the cells
+that changed since the last drawing, in place. Cube.perform_algorithm(verbose=True) draws through one when standard
+output is a terminal.
+"""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+import string
+from functools import lru_cache
+from typing import Dict, List, Tuple
+import facelets
+
+TEXT_CELLS = {colour: '[{}]'.format(colour) for colour in 'wyrogb'}
+ANSI_CELLS = {
+    'w': "\x1b[48;2;255;255;255m",
+    'y': "\x1b[48;2;255;255;45m",
+    'r': "\x1b[48;2;255;0;0m",
+    'o': "\x1b[48;2;255;110;0m",
+    'g': "\x1b[48;2;0;255;0m",
+    'b': "\x1b[48;2;0;174;255m"
+}
+ANSI_CELLS = {colour: code + '  \x1b[49m' for colour, code in ANSI_CELLS.items()}
+UNKNOWN_TEXT, UNKNOWN_ANSI = '[NA]', '\x1b[40m  \x1b[49m'
+# width on screen of a cell, which is also how many spaces indent the top and bottom faces by one cell
+TEXT_WIDTH, ANSI_WIDTH = 3, 2
+
+# definition offset of each face drawn along a line of the net: the top face, then left, front, right and back side
+# by side, then the bottom face; the top and bottom faces are indented by one face
+NET = ((None, 0), (36, 9, 18, 27), (None, 45))
+
+
+def _lines() -> List[Tuple[int, List[int]]]:
+    """indent in faces and definition indices of every line of the net"""
+    lines = []
+    for faces in NET:
+        for row in range(3):
+            indent = faces.count(None)
+            lines.append((indent, [offset + row * 3 + column for offset in faces if offset is not None
+                                   for column in range(3)]))
+
+    return lines
+
+
+LINES = _lines()
+# line and column, in cells, of every facelet of the definition
+PLACES = {idx: (line, indent * 3 + column) for line, (indent, indices) in enumerate(LINES)
+          for column, idx in enumerate(indices)}
+
+
+def _template(width: int) -> Tuple[str, tuple]:
+    """format string of the net and the definition indices to fill it with, in order"""
+    template = '\n'.join(' ' * indent * 3 * width + '{}' * len(indices) for indent, indices in LINES)
+    return template, tuple(idx for _, indices in LINES for idx in indices)
+
+
+def _cells(cells: Dict[str, str], unknown: str) -> dict:
+    table = {ord(char): unknown for char in string.ascii_letters + string.digits}
+    table.update({ord(colour): cell for colour, cell in cells.items()})
+    return table
+
+
+TEXT_TEMPLATE, ORDER = _template(TEXT_WIDTH)
+ANSI_TEMPLATE, _ = _template(ANSI_WIDTH)
+TEXT_TABLE, ANSI_TABLE = _cells(TEXT_CELLS, UNKNOWN_TEXT), _cells(ANSI_CELLS, UNKNOWN_ANSI)
+
+
+def draw(definition: str, ansi: bool = True) -> str:
+    """net of a cube definition, with no newline after the last line"""
+    template, table = (ANSI_TEMPLATE, ANSI_TABLE) if ansi else (TEXT_TEMPLATE, TEXT_TABLE)
+    return template.format(*[definition[idx] for idx in ORDER]).translate(table)
+
+
+@lru_cache(maxsize=1024)
+def draw_state(state: bytes, palette: facelets.Palette, centres: facelets.Palette, ansi: bool = True) -> str:
+    """net of a cubie state, as Cube.__repr__ (ansi) and Cube.__str__ draw it"""
+    return draw(facelets.to_definition(state, palette, centres), ansi)
+
+
+def ansi_cell(colour: str) -> str:
+    return ANSI_CELLS.get(colour, UNKNOWN_ANSI)
+
+
+def text_cell(colour: str) -> str:
+    return TEXT_CELLS.get(colour, UNKNOWN_TEXT)
+
+
+class TerminalView:
+    """Keeps one ANSI net of a cube, under a caption line, on a terminal up to date: the first drawing prints them
+    whole, every later one moves the cursor back over them and rewrites the caption and only the cells whose colour
+    changed. Nothing else may be printed in between, as the view finds its cells by counting lines up from the
+    cursor."""
+    def __init__(self, output=None):
+        self.output = output if output is not None else sys.stdout
+        self._shown = None
+
+    def draw(self, cubeobj, caption: str = '') -> None:
+        definition = cubeobj.define()
+        if self._shown is None:
+            self.output.write('{}\n{}\n'.format(caption, draw(definition)))
+
+        else:
+            # the caption is one line above the net
+            codes = ['\x1b[{0}A\r\x1b[2K{1}\x1b[{0}B\r'.format(len(LINES) + 1, caption)]
+            for idx, (old, new) in enumerate(zip(self._shown, definition)):
+                if old != new:
+                    line, column = PLACES[idx]
+                    up = len(LINES) - line
+                    # up to the cell's line, across to its column, draw it, then back down to the start of the line
+                    # below the net
+                    codes.append('\x1b[{}A\x1b[{}G{}\x1b[{}B\r'.format(up, column * ANSI_WIDTH + 1,
+                                                                      ansi_cell(new), up))
+            self.output.write(''.join(codes))
+
+        self.output.flush()
+        self._shown = definition
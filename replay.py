@@ -0,0 +1,142 @@
+"""Replay scramble logs (scrambles10.txt and co., or anything tracelog.FileSink wrote): solve every After: cube again
+and check that the solution really solves it.
+
+Everything streams. Records are parsed one line at a time, handed to batchsolve's worker pool, which only ever has a
+few chunks in flight, and results are written as they come back, so a log of millions of lines replays in constant
+memory.
+
+    python replay.py scrambles10.txt scrambles50.txt --workers 4 --output replayed.txt
+"""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+import argparse, itertools
+from typing import Iterable, Iterator, NamedTuple, Optional, TextIO
+import batchsolve, cube, tracelog
+
+# kind of event of every line prefix, the other way round from tracelog.PREFIXES
+KINDS = {prefix: kind for kind, prefix in tracelog.PREFIXES.items()}
+
+
+class Record(NamedTuple):
+    move_count: int
+    before: str
+    after: str
+    kind: str = 'scramble'
+    # where the record was read from, counting lines from 1
+    path: str = ''
+    line: int = 0
+
+
+class Outcome(NamedTuple):
+    record: Record
+    solution: Optional[str]
+    seconds: float
+    error: Optional[str] = None
+
+
+def parse_line(line: str) -> Record:
+    """the record in one line of a scramble log, raising ValueError if it is not one"""
+    count, before, after = line.rstrip('\n').split('\t')
+    if not before.startswith('Before:') or not after.startswith('After:'):
+        raise ValueError('Not a scramble log line: {!r}'.format(line))
+
+    count = count.strip()
+    letters = len(count) - len(count.lstrip('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+    prefix, count = count[:letters], count[letters:]
+    return Record(int(count), before[7:].strip(), after[6:].strip(), KINDS.get(prefix, prefix))
+
+
+def read_log(path) -> Iterator[Record]:
+    """every record of a scramble log, read lazily; blank lines are skipped"""
+    with open(path) as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+
+            try:
+                record = parse_line(line)
+
+            except ValueError:
+                raise ValueError('{}:{}: not a scramble log line'.format(path, number)) from None
+
+            yield record._replace(path=str(path), line=number)
+
+
+def read_logs(paths: Iterable, limit: Optional[int] = None) -> Iterator[Record]:
+    """the records of every log in turn, at most limit from each"""
+    for path in paths:
+        yield from itertools.islice(read_log(path), limit)
+
+
+def is_solved(definition: str) -> bool:
+    return all(len(set(definition[idx:idx + 9])) == 1 for idx in range(0, 54, 9))
+
+
+def verify(definition: str, solution: str) -> Optional[str]:
+    """None if solution solves the cube definition describes, otherwise what is wrong"""
+    cubeobj = cube.build(definition)
+    cubeobj.perform_algorithm(solution)
+    if not is_solved(cubeobj.define()):
+        return 'Solution "{}" does not solve the cube'.format(solution)
+
+
+def replay(records: Iterable[Record], **options) -> Iterator[Outcome]:
+    """Solve the After: cube of every record with batchsolve.solve_all, which takes the same options, and verify each
+    solution. Outcomes come back in record order."""
+    options['ordered'] = True
+    # the records waiting for their results are only those in flight, so the tee never buffers more than that
+    records, pending = itertools.tee(records)
+    results = batchsolve.solve_all((record.after for record in pending), **options)
+    for record, result in zip(records, results):
+        error = result.error
+        if error is None:
+            error = verify(record.after, result.solution)
+
+        yield Outcome(record, result.solution, result.seconds, error)
+
+
+def write_outcomes(outcomes: Iterable[Outcome], output: TextIO = sys.stdout, flush_every: int = 1000) -> dict:
+    """write a line per outcome as it arrives, flushing every flush_every lines, and then the totals; returns the
+    totals"""
+    solved = failed = moves = 0
+    for number, outcome in enumerate(outcomes, 1):
+        record = outcome.record
+        if outcome.error is None:
+            solved += 1
+            moves += len(outcome.solution.split())
+            result = '{:^10}\t{:.6f}'.format(len(outcome.solution.split()), outcome.seconds)
+        else:
+            failed += 1
+            result = '{:^10}\t{}'.format('failed', outcome.error)
+
+        output.write('{}:{}\t{:<8}\t{:^5}\t{}\n'.format(record.path, record.line, record.kind, record.move_count,
+                                                        result))
+        if number % flush_every == 0:
+            output.flush()
+
+    totals = {'solved': solved, 'failed': failed, 'mean_moves': moves / solved if solved else 0.0}
+    output.write('Replayed {solved} solved, {failed} failed, {mean_moves:.1f} moves per solve\n'.format(**totals))
+    output.flush()
+    return totals
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Solve and verify every cube in scramble logs again')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--limit', type=int, default=None, help='records to replay from each log')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, one per CPU by default')
+    parser.add_argument('--chunksize', type=int, default=64, help='records sent to a worker at a time')
+    parser.add_argument('--method', choices=('layers', 'twophase'), default='layers')
+    parser.add_argument('--cache', type=int, default=0, help='solutions each worker keeps to answer repeated cubes')
+    parser.add_argument('--output', help='file to write the results to rather than standard output')
+    args = parser.parse_args()
+    outcomes = replay(read_logs(args.paths, args.limit), workers=args.workers, chunksize=args.chunksize,
+                      method=args.method, cache_size=args.cache)
+    if args.output:
+        with open(args.output, 'w') as file:
+            totals = write_outcomes(outcomes, file)
+    else:
+        totals = write_outcomes(outcomes)
+
+    sys.exit(1 if totals['failed'] else 0)
@@ -0,0 +1,140 @@
+"""Reproducible scrambles.
+
+Every generator takes a seed: either an int (or anything else random.Random accepts) or a random.Random instance to
+draw from, so that a run can be repeated exactly. There are two kinds of scramble:
+
+- random_moves: a sequence of face turns with no two turns of the same face in a row, and opposite faces always in the
+  same order, so that no part of the scramble cancels out.
+- random_state: a cubie state (see cubie.py) drawn uniformly from every reachable state, without performing any moves.
+
+Neither kind ever contains a rotation or a turn undoing the one before it. Short move scrambles can still leave the
+cube close to solved, so both take a min_distance: scrambles are drawn again until twophase.lower_bound, a cheap
+bound on the moves needed to solve them, reaches it. The bound is weak: random states score 7 or 8, but so do
+nearly all scrambles of 10 or more moves, so it only rejects scrambles that leave the cube nearly solved (mostly
+ones under 10 moves) and cannot tell a 10 move scramble from a 100 move one.
+"""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+import random
+from typing import Iterator, List, Union
+import cubie
+
+Seed = Union[None, int, float, str, bytes, random.Random]
+# opposite faces are 3 apart
+FACES = 'URFDLB'
+SUFFIXES = ('', '2', "'")
+# scrambles drawn for a min_distance before giving up on it
+MAX_DRAWS = 10000
+
+
+def _rng(seed: Seed) -> random.Random:
+    return seed if isinstance(seed, random.Random) else random.Random(seed)
+
+
+def _face_turns(nummoves: int, rng: random.Random) -> List[str]:
+    moves, last = [], -1
+    while len(moves) < nummoves:
+        face = rng.randrange(6)
+        # skip a second turn of the same face, and U after D (and so on) as D U was already possible
+        if face == last or face == last - 3:
+            continue
+
+        moves.append(FACES[face] + SUFFIXES[rng.randrange(3)])
+        last = face
+
+    return moves
+
+
+def _perform(moves: List[str]) -> bytes:
+    state = cubie.SOLVED
+    for move in moves:
+        state = cubie.apply(state, cubie.MOVES[move])
+
+    return state
+
+
+def _far_enough(state: bytes, min_distance: int) -> bool:
+    if not min_distance:
+        return True
+
+    # the pruning tables are only loaded once a distance is asked for
+    import twophase
+    if min_distance > twophase.max_lower_bound():
+        raise ValueError('twophase.lower_bound never reaches {}, the most it gives is {}'.format(
+            min_distance, twophase.max_lower_bound()))
+
+    return twophase.lower_bound(state) >= min_distance
+
+
+def random_moves(nummoves: int = 25, seed: Seed = None, min_distance: int = 0) -> List[str]:
+    """nummoves face turns, drawn again until they leave the cube at least min_distance moves from solved by
+    twophase.lower_bound"""
+    if min_distance > nummoves:
+        raise ValueError('{} moves cannot scramble a cube {} moves from solved'.format(nummoves, min_distance))
+
+    rng = _rng(seed)
+    for _ in range(MAX_DRAWS):
+        moves = _face_turns(nummoves, rng)
+        if _far_enough(_perform(moves), min_distance):
+            return moves
+
+    raise ValueError('No scramble of {} moves reached {} moves from solved in {} draws'.format(nummoves, min_distance,
+                                                                                            MAX_DRAWS))
+
+
+def random_state(seed: Seed = None, min_distance: int = 0) -> bytes:
+    """uniformly random state, drawn again until it is at least min_distance moves from solved by
+    twophase.lower_bound"""
+    rng = _rng(seed)
+    for _ in range(MAX_DRAWS):
+        state = _random_state(rng)
+        if _far_enough(state, min_distance):
+            return state
+
+    raise ValueError('No random state reached {} moves from solved in {} draws'.format(min_distance, MAX_DRAWS))
+
+
+def _random_state(rng: random.Random) -> bytes:
+    """Uniformly random reachable state: corner and edge permutations of equal parity, corner twists summing to a
+    multiple of 3 and an even number of flipped edges."""
+    corners = rng.sample(range(8), 8)
+    edges = rng.sample(range(12), 12)
+    # swapping two edges maps every state of mismatched parity to exactly one valid state, so this stays uniform
+    if cubie.parity(corners) != cubie.parity(edges):
+        edges[0], edges[1] = edges[1], edges[0]
+
+    value = rng.randrange(3 ** 7)
+    twists = []
+    for _ in range(7):
+        value, twist = divmod(value, 3)
+        twists.append(twist)
+    twists.append(-sum(twists) % 3)
+
+    bits = rng.getrandbits(11)
+    flips = [bits >> idx & 1 for idx in range(11)]
+    flips.append(sum(flips) & 1)
+
+    return bytes([piece * 3 + twist for piece, twist in zip(corners, twists)] +
+                 [(piece + 8) * 3 + flip for piece, flip in zip(edges, flips)])
+
+
+def states(count: int, seed: Seed = None, min_distance: int = 0) -> Iterator[bytes]:
+    """count uniformly random states, all drawn from the one generator"""
+    rng = _rng(seed)
+    for _ in range(count):
+        yield random_state(rng, min_distance)
+
+
+def scrambles(count: int, nummoves: int = 25, seed: Seed = None, min_distance: int = 0) -> Iterator[str]:
+    """count random move scrambles, all drawn from the one generator"""
+    rng = _rng(seed)
+    for _ in range(count):
+        yield ' '.join(random_moves(nummoves, rng, min_distance))
+
+
+def scrambled_states(count: int, nummoves: int = 25, seed: Seed = None, min_distance: int = 0) -> Iterator[bytes]:
+    """states reached by count random move scrambles, applied to the cubie state directly"""
+    rng = _rng(seed)
+    for _ in range(count):
+        yield _perform(random_moves(nummoves, rng, min_distance))
@@ -0,0 +1,86 @@
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+from typing import Dict, List, Tuple
+import cubie
+
+OPPOSITES = {'R': 'L', 'L': 'R', 'U': 'D', 'D': 'U', 'F': 'B', 'B': 'F'}
+# quarter turns performed by each suffix; p and ' both mean anticlockwise
+TURNS = {'': 1, '2': 2, 'p': 3, "'": 3}
+NOTATION = {1: '', 2: '2', 3: "'"}
+
+
+def _rotation_face_maps() -> Dict[str, Dict[str, str]]:
+    """for every rotation r and face f, the face g such that 'r f' and 'g r' leave the cube in the same state"""
+    maps = {}
+    for axis in 'xyz':
+        for suffix in ('', "'", '2'):
+            rotation = cubie.MOVES[axis + suffix]
+            maps[axis + suffix] = {}
+            for face in OPPOSITES:
+                target = cubie.compose(rotation, cubie.MOVES[face])
+                for other in OPPOSITES:
+                    if cubie.compose(cubie.MOVES[other], rotation) == target:
+                        maps[axis + suffix][face] = other
+
+    return maps
+
+
+FACE_MAPS = _rotation_face_maps()
+
+
+def _expand(move: str) -> List[str]:
+    """rewrite slice and wide moves as the face turns and rotation they stand for"""
+    if move[0] in cubie.WIDES:
+        face, slice_ = cubie.WIDES[move[0]]
+        turns = TURNS[move[1:]] * (3 if slice_.endswith('p') else 1) % 4
+        return [face + move[1:]] + _expand(slice_[0] + NOTATION[turns])
+
+    if move[0] not in 'MES':
+        return [move]
+
+    name, suffix = move[0], move[1:]
+    if suffix == '2':
+        return list(cubie.SLICES[name]) * 2
+
+    return list(cubie.SLICES[name + ('p' if suffix else '')])
+
+
+def _push(output: List[Tuple[str, int]], face: str, turns: int) -> None:
+    """add a turn to output, merging it with the last turn of the same face if only its opposite face is between"""
+    for idx in (len(output) - 1, len(output) - 2):
+        if idx < 0:
+            break
+
+        other, other_turns = output[idx]
+        if other == face:
+            turns = (turns + other_turns) % 4
+            if turns:
+                output[idx] = (face, turns)
+            else:
+                del output[idx]
+            return
+
+        if other != OPPOSITES[face]:
+            break
+
+    output.append((face, turns))
+
+
+def simplify(moves: List[str]) -> List[str]:
+    """Shorten a move sequence without changing the state it produces, up to the orientation of the whole cube.
+    Rotations are moved to the end and dropped, slice moves become face turns, consecutive turns of one face merge and
+    opposite faces commute so that e.g. R L R' becomes L."""
+    # face actually turned by each face letter once every rotation so far has been moved past it
+    faces = {face: face for face in OPPOSITES}
+    output = []
+    for move in moves:
+        for move in _expand(move):
+            name, suffix = move[0], move[1:]
+            if name in 'xyz':
+                rotation = name + NOTATION[TURNS[suffix]]
+                faces = {face: faces[FACE_MAPS[rotation][face]] for face in OPPOSITES}
+
+            else:
+                _push(output, faces[name], TURNS[suffix])
+
+    return [face + NOTATION[turns] for face, turns in output]
@@ -0,0 +1,162 @@
+"""Cache of solutions, so that a cube solved before is solved again by a lookup.
+
+Cubes are keyed by what they look like, not by how they are held or coloured. The definition (see cube.build) of each
+of a cube's 24 whole cube rotations is written with the face letters U F R B L D in place of its colours, and the
+smallest of those strings is the key, together with the solving method. Every cube with the same key is the same
+position, so the one cached solution serves them all: solutions are stored for the cube held as its key reads, and
+each lookup relabels the faces turned by the solution for the rotation taking the cube there. Solutions are the face
+turns Cube.solve returns, so no rotations are ever stored.
+
+    cache = SolutionCache(maxsize=100000, path='solutions.db')
+    kube.solve(cache=cache)
+"""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+import dbm
+from collections import OrderedDict
+from functools import lru_cache
+from operator import itemgetter
+from typing import NamedTuple, Optional
+import cube, cubie, facelets, simplify
+
+FACE_LETTERS = 'URFBLD'
+
+
+class Key(NamedTuple):
+    # method and the face letter definition of the cube rotated as its key reads
+    text: str
+    # rotation taking the cube there
+    rotation: str
+
+
+def _facelet_order(rotation: cubie.Move) -> itemgetter:
+    """gets the definition after rotation out of the definition before it"""
+    order = [0] * facelets.DEFINITION_LENGTH
+    for dst, (src, translation) in enumerate(rotation.cubies):
+        code = translation[src * 3]
+        for axis, idx in enumerate(facelets.FACELET_INDEX[dst]):
+            if idx is not None:
+                face = cubie.FACELET_FACES[dst][code][axis]
+                order[idx] = facelets.FACELET_INDEX[src][cubie.HOME_FACES[src].index(face)]
+
+    for face, idx in enumerate(facelets.CENTRE_INDEX):
+        order[idx] = facelets.CENTRE_INDEX[rotation.centres[face]]
+
+    return itemgetter(*order)
+
+
+def _face_letters(rotation: cubie.Move) -> bytes:
+    """translation of the face letters of a cube to those of the faces they are on after rotation"""
+    before = ''.join(FACE_LETTERS[face] for face in rotation.centres).encode('ascii')
+    return bytes.maketrans(before, FACE_LETTERS.encode('ascii'))
+
+
+# per rotation: its name, how it moves the facelets and how it relabels the faces
+ROTATION_TABLES = tuple(zip(cubie.ROTATION_NAMES, map(_facelet_order, cubie.ROTATIONS),
+                            map(_face_letters, cubie.ROTATIONS)))
+
+
+def _invert(moves: str) -> str:
+    return ' '.join(move[0] if move[1:] in ('p', "'") else move if move[1:] == '2' else move + "'"
+                    for move in reversed(moves.split()))
+
+
+@lru_cache(maxsize=None)
+def _face_table(rotation: str) -> dict:
+    """face turned by each face letter of a cube first turned by rotation"""
+    return str.maketrans({face: simplify.simplify(rotation.split() + [face])[0] for face in simplify.OPPOSITES})
+
+
+def _turn(rotation: str, moves: str) -> str:
+    """face turns as they would be performed by a cube first turned by rotation"""
+    return moves.translate(_face_table(rotation))
+
+
+class SolutionCache:
+    def __init__(self, maxsize: int = 100000, path=None):
+        """Keep up to maxsize solutions in memory, evicting the least recently used. With a path, solutions are also
+        written to a dbm database there, which is read back on a miss and outlives the process."""
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+        self._solutions = OrderedDict()
+        self._store = dbm.open(str(path), 'c') if path is not None else None
+
+    def __len__(self) -> int:
+        return len(self._solutions)
+
+    def __repr__(self) -> str:
+        return 'SolutionCache({} of {} solutions, {} hits, {} misses)'.format(len(self), self.maxsize, self.hits,
+                                                                             self.misses)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def key(cubeobj: cube.Cube, method: str = 'layers') -> Key:
+        definition = cubeobj.define().encode('ascii')
+        centres = bytes(definition[idx] for idx in facelets.CENTRE_INDEX)
+        letters = definition.translate(bytes.maketrans(centres, FACE_LETTERS.encode('ascii')))
+        best = None
+        for rotation, order, relabel in ROTATION_TABLES:
+            text = bytes(order(letters)).translate(relabel)
+            if best is None or text < best[0]:
+                best = text, rotation
+
+        best = best[0].decode('ascii'), best[1]
+        return Key('{}:{}'.format(method, best[0]), best[1])
+
+    def get(self, key: Key) -> Optional[str]:
+        """solution of the cube key was made from, None if it has not been cached"""
+        solution = self._solutions.get(key.text)
+        if solution is not None:
+            self._solutions.move_to_end(key.text)
+
+        elif self._store is not None and key.text in self._store:
+            solution = self._store[key.text].decode('ascii')
+            self._remember(key.text, solution)
+
+        if solution is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return _turn(key.rotation, solution)
+
+    def put(self, key: Key, solution: str) -> None:
+        """cache the solution of the cube key was made from"""
+        solution = _turn(_invert(key.rotation), solution)
+        self._remember(key.text, solution)
+        if self._store is not None:
+            self._store[key.text] = solution
+
+    def _remember(self, text: str, solution: str) -> None:
+        self._solutions[text] = solution
+        self._solutions.move_to_end(text)
+        while len(self._solutions) > self.maxsize:
+            self._solutions.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def clear(self) -> None:
+        """forget the solutions in memory and the counters, leaving the on-disk store alone"""
+        self._solutions.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def close(self) -> None:
+        if self._store is not None:
+            self._store.close()
+            self._store = None
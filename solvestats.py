@@ -0,0 +1,112 @@
+"""Per-phase statistics of a solve, and histograms of them across many solves.
+
+    stats = solvestats.SolveStats()
+    cubeobj.solve(stats=stats)
+    print(stats)
+
+For each phase of the solve, PhaseStats records:
+- seconds: wall time
+- moves: moves applied to the cube, before simplification
+- references: solved reference cubes fetched to compare against
+"""
+
+import contextlib, time
+from collections import Counter
+from typing import Dict, Iterable, List
+
+FIELDS = ('seconds', 'moves', 'references')
+
+
+class PhaseStats:
+    __slots__ = FIELDS
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.moves = self.references = 0
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def __repr__(self):
+        return 'PhaseStats({})'.format(', '.join('{}={!r}'.format(field, getattr(self, field)) for field in FIELDS))
+
+
+class SolveStats:
+    def __init__(self):
+        self.phases = {}  # type: Dict[str, PhaseStats]
+        # counters of the phase being solved; anything counted outside a phase is not kept
+        self.current = PhaseStats()
+        # length of the simplified solution
+        self.solution = 0
+
+    @contextlib.contextmanager
+    def phase(self, name: str, recording: List[str]):
+        """count everything done inside the with block towards phase name; recording is the cube's list of moves"""
+        previous, self.current = self.current, self.phases.setdefault(name, PhaseStats())
+        moves, start = len(recording), time.perf_counter()
+        try:
+            yield self.current
+        finally:
+            self.current.seconds += time.perf_counter() - start
+            self.current.moves += len(recording) - moves
+            self.current = previous
+
+    def total(self) -> PhaseStats:
+        total = PhaseStats()
+        for stats in self.phases.values():
+            for field in FIELDS:
+                setattr(total, field, getattr(total, field) + getattr(stats, field))
+
+        return total
+
+    def as_dict(self) -> dict:
+        phases = {name: stats.as_dict() for name, stats in self.phases.items()}
+        phases['total'] = self.total().as_dict()
+        return {'phases': phases, 'solution': self.solution}
+
+    def __str__(self):
+        lines = ['{:<14}{:>12}{:>8}{:>12}'.format('phase', *FIELDS)]
+        for name, stats in list(self.phases.items()) + [('total', self.total())]:
+            lines.append('{:<14}{:>12.6f}{:>8}{:>12}'.format(name, *(getattr(stats, field) for field in FIELDS)))
+
+        lines.append('solution: {} moves'.format(self.solution))
+        return '\n'.join(lines)
+
+
+class Histograms:
+    """Counts of every field of every phase over a batch of solves; 'total' covers the whole solve. Times are
+    bucketed by seconds_bucket seconds, everything else by value."""
+    def __init__(self, seconds_bucket: float = 0.001):
+        self.seconds_bucket = seconds_bucket
+        self.solves = 0
+        self.counts = {}  # type: Dict[str, Dict[str, Counter]]
+
+    def add(self, stats: SolveStats) -> None:
+        self.solves += 1
+        phases = dict(stats.phases)
+        phases['total'] = stats.total()
+        for name, phase in phases.items():
+            counts = self.counts.setdefault(name, {field: Counter() for field in FIELDS})
+            for field in FIELDS:
+                counts[field][self._bucket(field, getattr(phase, field))] += 1
+
+    def update(self, batch: Iterable[SolveStats]) -> None:
+        for stats in batch:
+            self.add(stats)
+
+    def _bucket(self, field: str, value):
+        if field == 'seconds':
+            return round(value // self.seconds_bucket * self.seconds_bucket, 9)
+
+        return value
+
+    def histogram(self, phase: str, field: str) -> List[tuple]:
+        """(bucket, number of solves) pairs in bucket order"""
+        return sorted(self.counts.get(phase, {}).get(field, Counter()).items())
+
+    def as_dict(self) -> dict:
+        return {
+            'solves': self.solves,
+            'seconds_bucket': self.seconds_bucket,
+            'phases': {name: {field: self.histogram(name, field) for field in FIELDS} for name in self.counts}
+        }
@@ -0,0 +1,216 @@
+"""Compact binary archives of scramble logs.
+
+Every cube is packed into 9 bytes rather than a 60 column colour string. Its cubie state is read against its own
+centres (see facelets.py). The state is then written as a single number made of:
+
+- the rank of the corner permutation (8!) and the edge permutation (12!);
+- 7 corner twists and 11 edge flips, the last twist and flip following from the others;
+- the rotation (one of 24) that turns the archive's colour scheme into the cube's centres.
+
+A record of a scramble log (see replay.py) is then 21 bytes. That is its kind, its move count, and the Before: and
+After: cubes.
+
+An archive is a short header, giving the colour scheme, followed by fixed size records. Appending only ever writes
+to the end. Reading memory maps the file, so record i is found by an offset and decoded on its own, with no parsing of
+the rest of the file.
+
+    python statefile.py pack scrambles10.txt scrambles10.bin
+    python statefile.py unpack scrambles10.bin scrambles10.txt
+"""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+import argparse, mmap, os, struct
+from math import factorial
+from typing import Iterable, Iterator, List, Optional, Sequence, TextIO
+import cubie, facelets, replay, tracelog, validate
+
+# magic, version, colour scheme of the archive in cubie.FACES order
+HEADER = struct.Struct('<4sI6s2x')
+MAGIC = b'RBPS'
+VERSION = 1
+STATE_SIZE = 9
+# kind, move count, before, after
+RECORD = struct.Struct('<BH{0}s{0}s'.format(STATE_SIZE))
+KINDS = ('scramble', 'cross', 'corners')
+
+N_CORNERS, N_TWIST, N_EDGES = factorial(8), 3 ** 7, factorial(12)
+N_ROTATIONS = len(cubie.ROTATIONS)
+
+
+def _digits(digits: Sequence[int], base: int) -> int:
+    value = 0
+    for digit in reversed(digits):
+        value = value * base + digit
+
+    return value
+
+
+def _undigits(value: int, base: int, count: int) -> List[int]:
+    digits = []
+    for _ in range(count):
+        value, digit = divmod(value, base)
+        digits.append(digit)
+
+    return digits
+
+
+def encode(definition: str, palette: facelets.Palette) -> bytes:
+    """the 9 bytes of a solvable cube definition whose colour scheme is palette"""
+    state, centres = validate.read(definition)
+    rotation = cubie.rotation_between(tuple(palette), centres)
+    if rotation is None:
+        raise ValueError('Cube definition "{}" does not have the colours {}'.format(definition, ''.join(palette)))
+
+    cp, co, ep, eo = cubie.split(state)
+    value = _digits(eo[:11], 2)
+    value = value * N_EDGES + cubie.rank(ep)
+    value = value * N_TWIST + _digits(co[:7], 3)
+    value = value * N_CORNERS + cubie.rank(cp)
+    return (value * N_ROTATIONS + rotation).to_bytes(STATE_SIZE, 'little')
+
+
+def decode(data: bytes, palette: facelets.Palette) -> str:
+    """the cube definition packed into data by encode"""
+    value, rotation = divmod(int.from_bytes(data, 'little'), N_ROTATIONS)
+    value, cp = divmod(value, N_CORNERS)
+    value, co = divmod(value, N_TWIST)
+    eo, ep = divmod(value, N_EDGES)
+    twists = _undigits(co, 3, 7)
+    twists.append(-sum(twists) % 3)
+    flips = _undigits(eo, 2, 11)
+    flips.append(sum(flips) % 2)
+    state = bytes([piece * 3 + twist for piece, twist in zip(cubie.unrank(cp, 8), twists)] +
+                  [(piece + 8) * 3 + flip for piece, flip in zip(cubie.unrank(ep, 12), flips)])
+    centres = tuple(palette[face] for face in cubie.ROTATIONS[rotation].centres)
+    return facelets.to_definition(state, centres)
+
+
+class StateArchive:
+    def __init__(self, path, palette: Optional[Sequence[str]] = None):
+        """Open the archive at path, creating it if needed. A new archive takes the colour scheme palette (centre
+        colours in cubie.FACES order), or that of the first cube appended to it."""
+        self.path = pathlib.Path(path)
+        self.palette = None
+        self._file = open(self.path, 'a+b')
+        self._map = None
+        self._file.seek(0)
+        header = self._file.read(HEADER.size)
+        if header:
+            if len(header) < HEADER.size:
+                raise ValueError('{} is not a state archive'.format(self.path))
+
+            magic, version, palette_bytes = HEADER.unpack(header)
+            if (magic, version) != (MAGIC, VERSION):
+                raise ValueError('{} is not a version {} state archive'.format(self.path, VERSION))
+
+            self.palette = tuple(palette_bytes.decode('ascii'))
+
+        elif palette is not None:
+            self._write_header(tuple(palette))
+
+    def _write_header(self, palette: facelets.Palette) -> None:
+        self.palette = palette
+        self._file.write(HEADER.pack(MAGIC, VERSION, ''.join(palette).encode('ascii')))
+
+    def __len__(self) -> int:
+        size = os.fstat(self._file.fileno()).st_size
+        return max(0, size - HEADER.size) // RECORD.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, record: replay.Record) -> None:
+        self.extend([record])
+
+    def extend(self, records: Iterable[replay.Record], batch_size: int = 4096) -> None:
+        """append records, writing batch_size of them at a time"""
+        packed = []
+        for record in records:
+            if self.palette is None:
+                self._write_header(facelets.palette_of(record.before.lower()))
+
+            if record.kind not in KINDS:
+                raise ValueError('Unknown kind of record {}'.format(record.kind))
+
+            packed.append(RECORD.pack(KINDS.index(record.kind), record.move_count, encode(record.before, self.palette),
+                                      encode(record.after, self.palette)))
+            if len(packed) >= batch_size:
+                self._write(packed)
+                packed = []
+
+        self._write(packed)
+
+    def _write(self, packed: List[bytes]) -> None:
+        if packed:
+            self._close_map()
+            self._file.write(b''.join(packed))
+            self._file.flush()
+
+    def _close_map(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __getitem__(self, index: int) -> replay.Record:
+        count = len(self)
+        if index < 0:
+            index += count
+
+        if not 0 <= index < count:
+            raise IndexError('StateArchive index out of range')
+
+        if self._map is None:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        kind, move_count, before, after = RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size)
+        return replay.Record(move_count, decode(before, self.palette), decode(after, self.palette), KINDS[kind],
+                             str(self.path), index + 1)
+
+    def __iter__(self) -> Iterator[replay.Record]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self) -> None:
+        self._close_map()
+        self._file.close()
+
+
+def pack(log_paths: Iterable, path) -> int:
+    """append the records of scramble logs to the archive at path, returning how many there are now"""
+    with StateArchive(path) as archive:
+        archive.extend(replay.read_logs(log_paths))
+        return len(archive)
+
+
+def unpack(path, output: TextIO) -> int:
+    """write the records of the archive at path out as a scramble log, returning how many there were"""
+    with StateArchive(path) as archive:
+        for record in archive:
+            output.write(tracelog.format_line(record.kind, record.move_count, record.before, record.after))
+
+        return len(archive)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert scramble logs to and from compact binary archives')
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack_parser = commands.add_parser('pack', help='append scramble logs to an archive')
+    pack_parser.add_argument('logs', nargs='+')
+    pack_parser.add_argument('archive')
+    unpack_parser = commands.add_parser('unpack', help='write an archive out as a scramble log')
+    unpack_parser.add_argument('archive')
+    unpack_parser.add_argument('log', nargs='?', help='log to write, standard output by default')
+    args = parser.parse_args()
+    if args.command == 'pack':
+        print('{} records in {}'.format(pack(args.logs, args.archive), args.archive))
+
+    elif args.log:
+        with open(args.log, 'w') as file:
+            unpack(args.archive, file)
+
+    else:
+        unpack(args.archive, sys.stdout)
@@ -0,0 +1,24 @@
+"""Checks of cubebatch.py; run with python -m pytest."""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+import cubebatch, cubie, validate
+
+MOVES = ('x', 'y', "z'", 'M', 'E2', "S'", 'r', "x M y'")
+
+
+def test_problems_of_a_turned_batch():
+    for moves in MOVES:
+        batch = cubebatch.CubeBatch.random(4, seed=0)
+        batch.apply(moves)
+        assert batch.problems() == [None] * 4, moves
+        assert batch.problems() == [validate.problem(definition) for definition in batch.define()]
+
+
+def test_problems_of_a_turned_batch_with_a_twisted_corner():
+    # the first corner twisted in place can never be solved, however the batch is turned afterwards
+    twisted = bytes([cubie.SOLVED[0] + 1]) + cubie.SOLVED[1:]
+    for moves in MOVES:
+        batch = cubebatch.CubeBatch(cubie.SOLVED + twisted)
+        batch.apply(moves)
+        assert batch.problems() == [None, 'Cube cannot be solved: a corner is twisted'], moves
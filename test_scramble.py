@@ -0,0 +1,33 @@
+"""Checks of scramble.py and Cube.scramble; run with python -m pytest."""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+import pytest
+import cube, cubie, scramble, twophase, validate
+
+
+def test_random_state_of_a_held_cube_is_solvable():
+    # the state is drawn against the cube's colour scheme, however the cube is held when it is scrambled
+    for idx, rotation in enumerate(cubie.ROTATION_NAMES):
+        cubeobj = cube.Cube()
+        cubeobj.perform_algorithm(rotation)
+        centres = cubeobj.define()[4::9]
+        cubeobj.scramble(printrepr=False, seed=idx, random_state=True)
+        assert cubeobj.define()[4::9] == centres
+        assert validate.problem(cubeobj.define()) is None, rotation
+
+
+def test_random_state_leaves_the_solved_reference_alone():
+    reference = cube.solved()
+    with pytest.raises(TypeError):
+        reference.scramble(printrepr=False, seed=0, random_state=True)
+
+    assert reference.define() == cube.Cube().define()
+
+
+def test_min_distance_past_the_lower_bound_is_refused():
+    with pytest.raises(ValueError):
+        scramble.random_state(1, min_distance=twophase.max_lower_bound() + 1)
+
+    with pytest.raises(ValueError):
+        scramble.random_moves(25, 1, min_distance=twophase.max_lower_bound() + 1)
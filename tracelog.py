@@ -0,0 +1,135 @@
+"""Optional tracing of scrambles.
+
+Nothing is recorded unless a sink is installed, and callers check enabled() before doing any work to describe an
+event, so untraced solves pay a single function call. A sink is any object with ``emit(event)``:
+
+- RingBuffer keeps the last few events in memory.
+- FileSink appends them to a log in the format of scrambles10.txt, in batches, optionally from a background thread.
+
+    with tracelog.tracing(tracelog.FileSink('scramblesShaker10.txt')):
+        cubeobj.scramble()
+"""
+
+import atexit, collections, contextlib, queue, threading
+from typing import Iterator, List, NamedTuple, Optional
+
+# line prefix of every kind of event in a scramble log; cross and corners are the shaker restarts older solvers logged
+PREFIXES = {'scramble': '', 'cross': 'Cr', 'corners': 'Co'}
+
+
+class Event(NamedTuple):
+    kind: str
+    moves: str
+    before: str
+    after: str
+
+    def line(self) -> str:
+        return format_line(self.kind, len(self.moves.split()), self.before, self.after)
+
+
+def format_line(kind: str, move_count: int, before: str, after: str) -> str:
+    """a line of a scramble log"""
+    return '{}{:^5}\tBefore: {:^60}\tAfter: {:^60}\n'.format(PREFIXES.get(kind, kind), move_count, before, after)
+
+
+class RingBuffer:
+    def __init__(self, size: int = 1024):
+        self.events = collections.deque(maxlen=size)
+
+    def emit(self, event: Event) -> None:
+        self.events.append(event)
+
+    def __iter__(self) -> Iterator[Event]:
+        return iter(self.events)
+
+    def __len__(self):
+        return len(self.events)
+
+
+class FileSink:
+    """Append events to path, batch_size lines at a time. With background=True the writes happen on a separate thread
+    so emit never waits on the disk. Whatever is left is written by close(), which also runs at exit."""
+    def __init__(self, path, batch_size: int = 256, background: bool = False):
+        self.path = path
+        self.batch_size = batch_size
+        self._lines = []  # type: List[str]
+        self._lock = threading.Lock()
+        self._queue = None  # type: Optional[queue.Queue]
+        self._thread = None  # type: Optional[threading.Thread]
+        if background:
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._writer, daemon=True)
+            self._thread.start()
+
+        atexit.register(self.close)
+
+    def emit(self, event: Event) -> None:
+        with self._lock:
+            self._lines.append(event.line())
+            if len(self._lines) < self.batch_size:
+                return
+
+            lines, self._lines = self._lines, []
+
+        self._write(lines)
+
+    def flush(self) -> None:
+        with self._lock:
+            lines, self._lines = self._lines, []
+
+        if lines:
+            self._write(lines)
+
+    def close(self) -> None:
+        self.flush()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+        atexit.unregister(self.close)
+
+    def _write(self, lines: List[str]) -> None:
+        if self._thread is not None:
+            self._queue.put(lines)
+        else:
+            self._append(lines)
+
+    def _append(self, lines: List[str]) -> None:
+        with open(self.path, 'a') as file:
+            file.writelines(lines)
+
+    def _writer(self) -> None:
+        for lines in iter(self._queue.get, None):
+            self._append(lines)
+
+
+_sink = None
+
+
+def enabled() -> bool:
+    return _sink is not None
+
+
+def emit(kind: str, moves: str, before: str, after: str) -> None:
+    if _sink is not None:
+        _sink.emit(Event(kind, moves, before, after))
+
+
+def set_sink(sink) -> Optional[object]:
+    """install sink (None turns tracing off), returning the previous one"""
+    global _sink
+    previous, _sink = _sink, sink
+    return previous
+
+
+@contextlib.contextmanager
+def tracing(sink):
+    """trace to sink for the duration of a with block, closing it afterwards if it can be closed"""
+    previous = set_sink(sink)
+    try:
+        yield sink
+    finally:
+        set_sink(previous)
+        if hasattr(sink, 'close'):
+            sink.close()
@@ -0,0 +1,428 @@
+"""Two-phase solver in the style of Kociemba's algorithm.
+
+Phase 1 brings the cube into the subgroup generated by U, D, R2, L2, F2 and B2: every corner twist and edge flip is
+solved and the middle layer edges are in the middle layer. Phase 2 then solves the cube using only those moves. Both
+phases are iterative deepening searches over small integer coordinates of the cubie state (see cubie.py), guided by
+pruning tables that hold the exact distance to the goal of a pair of coordinates.
+
+The search keeps looking for shorter solutions until one is at most max_length moves long or the time budget runs
+out, and returns the best one found.
+"""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+import mmap, os, struct, time, zlib
+from array import array
+from functools import lru_cache
+from math import comb
+from typing import List, NamedTuple, Optional, Sequence
+import cubie, facelets
+
+MOVE_NAMES = tuple(face + suffix for face in 'URFDLB' for suffix in ('', '2', "'"))
+# U, D and half turns of the other faces keep the cube in the phase 2 subgroup
+PHASE2_MOVES = tuple(idx for idx, name in enumerate(MOVE_NAMES) if name[0] in 'UD' or name.endswith('2'))
+
+# edges are numbered 0-11 from position 8; 4-7 are the middle layer
+UD_EDGES = (0, 1, 2, 3, 8, 9, 10, 11)
+SLICE_EDGES = (4, 5, 6, 7)
+# edge positions ranked for the slice coordinate, middle layer first so that a solved cube has slice 0
+_SLICE_ORDER = SLICE_EDGES + UD_EDGES
+N_TWIST, N_FLIP, N_SLICE, N_PERM8, N_PERM4 = 3 ** 7, 2 ** 11, comb(12, 4), 40320, 24
+# phase 1 on its own never needs more moves than this
+PHASE1_DEPTH = 12
+# search nodes between two looks at the clock
+CHECK_EVERY = 1000
+# letters to label centres with while turning a state to another axis, for lower_bound
+_LETTERS = tuple('urfbld')
+
+# tables are cached next to this file; bump the version whenever a coordinate or table layout changes
+TABLES_PATH = pathlib.Path(__file__).parent / 'twophase.tables'
+TABLES_VERSION = 1
+# magic, version, byte order of the move tables, crc32 of everything after the header
+_HEADER = struct.Struct('<4sIc3xI')
+_MAGIC = b'RBTP'
+
+
+class Tables(NamedTuple):
+    # move tables of unsigned shorts: table[move * size + coordinate] is the coordinate after the move
+    twist: Sequence[int]
+    flip: Sequence[int]
+    slice: Sequence[int]
+    corners: Sequence[int]
+    edges: Sequence[int]
+    slice_perm: Sequence[int]
+    # pruning tables of bytes: distance to the goal of coordinate pairs, indexed first * size of second + second
+    twist_slice: Sequence[int]
+    flip_slice: Sequence[int]
+    corners_slice: Sequence[int]
+    edges_slice: Sequence[int]
+
+
+# number of values of each table's coordinate(s), in Tables order
+SIZES = (N_TWIST, N_FLIP, N_SLICE, N_PERM8, N_PERM8, N_PERM4,
+         N_TWIST * N_SLICE, N_FLIP * N_SLICE, N_PERM8 * N_PERM4, N_PERM8 * N_PERM4)
+
+
+# ------------------------------------------------- COORDINATES ------------------------------------------------- #
+def twist(state: bytes) -> int:
+    value = 0
+    for code in state[:7]:
+        value = value * 3 + code % 3
+
+    return value
+
+
+def flip(state: bytes) -> int:
+    value = 0
+    for code in state[8:19]:
+        value = value * 2 + code % 3
+
+    return value
+
+
+def slice_(state: bytes) -> int:
+    ranks = sorted(rank for rank, edge in enumerate(_SLICE_ORDER) if state[8 + edge] // 3 - 8 in SLICE_EDGES)
+    return sum(comb(rank, idx + 1) for idx, rank in enumerate(ranks))
+
+
+def corners(state: bytes) -> int:
+    return cubie.rank([code // 3 for code in state[:8]])
+
+
+def edges(state: bytes) -> int:
+    """permutation of the top and bottom layer edges, only meaningful in phase 2"""
+    return cubie.rank([UD_EDGES.index(state[8 + edge] // 3 - 8) for edge in UD_EDGES])
+
+
+def slice_perm(state: bytes) -> int:
+    """permutation of the middle layer edges, only meaningful in phase 2"""
+    return cubie.rank([state[8 + edge] // 3 - 12 for edge in SLICE_EDGES])
+
+
+def _state(corner_labels=range(8), corner_twists=(0,) * 8, edge_labels=range(12), edge_flips=(0,) * 12) -> bytes:
+    return bytes([label * 3 + twist for label, twist in zip(corner_labels, corner_twists)] +
+                 [(label + 8) * 3 + flip for label, flip in zip(edge_labels, edge_flips)])
+
+
+def _twist_state(value: int) -> bytes:
+    twists = []
+    for _ in range(7):
+        value, digit = divmod(value, 3)
+        twists.insert(0, digit)
+
+    return _state(corner_twists=twists + [-sum(twists) % 3])
+
+
+def _flip_state(value: int) -> bytes:
+    flips = []
+    for _ in range(11):
+        value, digit = divmod(value, 2)
+        flips.insert(0, digit)
+
+    return _state(edge_flips=flips + [sum(flips) % 2])
+
+
+def _slice_state(value: int) -> bytes:
+    ranks = []
+    for idx in range(4, 0, -1):
+        rank = idx - 1
+        while comb(rank + 1, idx) <= value:
+            rank += 1
+
+        value -= comb(rank, idx)
+        ranks.append(rank)
+
+    chosen = {_SLICE_ORDER[rank] for rank in ranks}
+    middle, others = iter(SLICE_EDGES), iter(UD_EDGES)
+    return _state(edge_labels=[next(middle) if edge in chosen else next(others) for edge in range(12)])
+
+
+def _corners_state(value: int) -> bytes:
+    return _state(corner_labels=cubie.unrank(value, 8))
+
+
+def _edges_state(value: int) -> bytes:
+    labels = list(range(12))
+    for edge, idx in zip(UD_EDGES, cubie.unrank(value, 8)):
+        labels[edge] = UD_EDGES[idx]
+
+    return _state(edge_labels=labels)
+
+
+def _slice_perm_state(value: int) -> bytes:
+    labels = list(range(12))
+    for edge, idx in zip(SLICE_EDGES, cubie.unrank(value, 4)):
+        labels[edge] = SLICE_EDGES[idx]
+
+    return _state(edge_labels=labels)
+
+
+# ------------------------------------------------- TABLES ------------------------------------------------- #
+def _move_table(size: int, coordinate, representative, moves=range(len(MOVE_NAMES))) -> array:
+    """table[move * size + value] for every move, rows of moves outside the given ones are left as zeros"""
+    table = array('H', bytes(2 * size * len(MOVE_NAMES)))
+    states = [representative(value) for value in range(size)]
+    for move in moves:
+        compiled = cubie.MOVES[MOVE_NAMES[move]]
+        row = [coordinate(cubie.apply(state, compiled)) for state in states]
+        table[move * size:(move + 1) * size] = array('H', row)
+
+    return table
+
+
+def _pruning_table(first: array, first_size: int, second: array, second_size: int, moves) -> bytearray:
+    """breadth first search from the goal over pairs of coordinates"""
+    table = bytearray(b'\xff') * (first_size * second_size)
+    table[0] = 0
+    frontier, depth = [0], 0
+    while frontier:
+        found = []
+        for idx in frontier:
+            a, b = divmod(idx, second_size)
+            for move in moves:
+                new = first[move * first_size + a] * second_size + second[move * second_size + b]
+                if table[new] == 255:
+                    table[new] = depth + 1
+                    found.append(new)
+
+        frontier, depth = found, depth + 1
+
+    return table
+
+
+def build_tables() -> Tables:
+    all_moves = range(len(MOVE_NAMES))
+    twist_table = _move_table(N_TWIST, twist, _twist_state)
+    flip_table = _move_table(N_FLIP, flip, _flip_state)
+    slice_table = _move_table(N_SLICE, slice_, _slice_state)
+    corners_table = _move_table(N_PERM8, corners, _corners_state, PHASE2_MOVES)
+    edges_table = _move_table(N_PERM8, edges, _edges_state, PHASE2_MOVES)
+    slice_perm_table = _move_table(N_PERM4, slice_perm, _slice_perm_state, PHASE2_MOVES)
+
+    return Tables(
+        twist_table, flip_table, slice_table, corners_table, edges_table, slice_perm_table,
+        _pruning_table(twist_table, N_TWIST, slice_table, N_SLICE, all_moves),
+        _pruning_table(flip_table, N_FLIP, slice_table, N_SLICE, all_moves),
+        _pruning_table(corners_table, N_PERM8, slice_perm_table, N_PERM4, PHASE2_MOVES),
+        _pruning_table(edges_table, N_PERM8, slice_perm_table, N_PERM4, PHASE2_MOVES)
+    )
+
+
+def _table_bytes() -> List[int]:
+    return [2 * len(MOVE_NAMES) * size for size in SIZES[:6]] + list(SIZES[6:])
+
+
+def save_tables(tables: Tables, path: pathlib.Path = TABLES_PATH) -> None:
+    """write tables to path through a temporary file, so that other processes never see half a file"""
+    payload = [bytes(table) for table in tables]
+    checksum = 0
+    for part in payload:
+        checksum = zlib.crc32(part, checksum)
+
+    temporary = path.with_name('{}.{}.tmp'.format(path.name, os.getpid()))
+    with open(temporary, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, TABLES_VERSION, sys.byteorder[0].encode(), checksum))
+        for part in payload:
+            file.write(part)
+
+    os.replace(temporary, path)
+
+
+def load_tables(path: pathlib.Path = TABLES_PATH) -> Optional[Tables]:
+    """Map the tables in path read-only, so that every process solving on this machine shares the same pages. Returns
+    None if the file is missing, was written by another version or byte order, or fails its checksum."""
+    try:
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    except (OSError, ValueError):
+        return None
+
+    lengths = _table_bytes()
+    if len(mapped) != _HEADER.size + sum(lengths):
+        return None
+
+    magic, version, byteorder, checksum = _HEADER.unpack_from(mapped)
+    view = memoryview(mapped)
+    if (magic, version, byteorder) != (_MAGIC, TABLES_VERSION, sys.byteorder[0].encode()) or \
+            zlib.crc32(view[_HEADER.size:]) != checksum:
+        return None
+
+    parts, offset = [], _HEADER.size
+    for idx, length in enumerate(lengths):
+        part = view[offset:offset + length]
+        parts.append(part.cast('H') if idx < 6 else part)
+        offset += length
+
+    return Tables(*parts)
+
+
+@lru_cache(maxsize=None)
+def tables() -> Tables:
+    """tables from the cache file, built and saved first if the cache cannot be used"""
+    loaded = load_tables()
+    if loaded is not None:
+        return loaded
+
+    built = build_tables()
+    try:
+        save_tables(built)
+    except OSError:
+        return built
+
+    return load_tables() or built
+
+
+def _held(state: bytes, rotation: str) -> bytes:
+    """state of the same cube turned by a whole cube rotation, labelled against its centres after the turn"""
+    move = cubie.MOVES[rotation]
+    centres = tuple(_LETTERS[face] for face in move.centres)
+    return facelets.to_state(facelets.to_definition(cubie.apply(state, move), _LETTERS, centres))[0]
+
+
+def lower_bound(state: bytes) -> int:
+    """Fewest face turns that could solve a state labelled against its current centres. No solution is shorter than
+    phase 1, so the pruning tables bound the distance from below; the cube is also turned so that each of the other
+    two axes takes the place of the top and bottom, and the best of the three bounds is kept."""
+    t = tables()
+    bound = 0
+    for held in (state, _held(state, 'x'), _held(state, 'z')):
+        sl = slice_(held)
+        bound = max(bound, t.twist_slice[twist(held) * N_SLICE + sl], t.flip_slice[flip(held) * N_SLICE + sl])
+
+    return bound
+
+
+@lru_cache(maxsize=None)
+def max_lower_bound() -> int:
+    """the most lower_bound can ever return, the largest value in the pruning tables it reads"""
+    t = tables()
+    return max(max(t.twist_slice), max(t.flip_slice))
+
+
+# ------------------------------------------------- SEARCH ------------------------------------------------- #
+class _Search:
+    def __init__(self, state: bytes, max_length: int, timeout: float):
+        self.tables = tables()
+        self.state = state
+        self.max_length = max_length
+        self.deadline = time.monotonic() + timeout
+        self.best = None  # type: Optional[List[int]]
+        # nodes searched, and whether the search is unwinding because time ran out
+        self.nodes = 0
+        self.expired = False
+
+    def run(self) -> Optional[List[int]]:
+        t = self.tables
+        tw, fl, sl = twist(self.state), flip(self.state), slice_(self.state)
+        depth = max(t.twist_slice[tw * N_SLICE + sl], t.flip_slice[fl * N_SLICE + sl])
+        # stop once phase 1 is as long as the best solution found
+        while depth <= PHASE1_DEPTH and (self.best is None or depth < len(self.best)):
+            if self._phase1(tw, fl, sl, depth, -1, []):
+                break
+
+            depth += 1
+
+        return self.best
+
+    def _done(self) -> bool:
+        if self.best is None:
+            return False
+
+        return len(self.best) <= self.max_length or self.expired or time.monotonic() > self.deadline
+
+    def _expired(self) -> bool:
+        """True once there is a solution to return and time is up; the clock is read every CHECK_EVERY nodes"""
+        if not self.expired:
+            self.nodes += 1
+            if self.nodes % CHECK_EVERY == 0 and self.best is not None and time.monotonic() > self.deadline:
+                self.expired = True
+
+        return self.expired
+
+    def _phase1(self, tw: int, fl: int, sl: int, depth: int, last: int, path: List[int]) -> bool:
+        """depth first search for every phase 1 solution of exactly depth moves; True once the search is done"""
+        if depth == 0:
+            # a phase 1 solution ending in a phase 2 move was already tried without its last move
+            if not path or path[-1] not in PHASE2_MOVES:
+                self._start_phase2(path)
+
+            return self._done()
+
+        if self._expired():
+            return True
+
+        t = self.tables
+        for move in range(18):
+            face = move // 3
+            if face == last or face == last - 3:
+                continue
+
+            ntw, nfl, nsl = t.twist[move * N_TWIST + tw], t.flip[move * N_FLIP + fl], t.slice[move * N_SLICE + sl]
+            if max(t.twist_slice[ntw * N_SLICE + nsl], t.flip_slice[nfl * N_SLICE + nsl]) < depth:
+                path.append(move)
+                if self._phase1(ntw, nfl, nsl, depth - 1, face, path):
+                    return True
+
+                path.pop()
+
+        return False
+
+    def _start_phase2(self, path: List[int]) -> None:
+        state = self.state
+        for move in path:
+            state = cubie.apply(state, cubie.MOVES[MOVE_NAMES[move]])
+
+        t = self.tables
+        cp, ep, sp = corners(state), edges(state), slice_perm(state)
+        limit = (len(self.best) - 1 if self.best else 30) - len(path)
+        depth = max(t.corners_slice[cp * N_PERM4 + sp], t.edges_slice[ep * N_PERM4 + sp])
+        last = path[-1] // 3 if path else -1
+        while depth <= limit and not self.expired:
+            found = self._phase2(cp, ep, sp, depth, last, [])
+            if found is not None:
+                self.best = path + found
+                return
+
+            depth += 1
+
+    def _phase2(self, cp: int, ep: int, sp: int, depth: int, last: int, path: List[int]) -> Optional[List[int]]:
+        if depth == 0:
+            return list(path)
+
+        if self._expired():
+            return None
+
+        t = self.tables
+        for move in PHASE2_MOVES:
+            face = move // 3
+            if face == last or face == last - 3:
+                continue
+
+            ncp = t.corners[move * N_PERM8 + cp]
+            nep = t.edges[move * N_PERM8 + ep]
+            nsp = t.slice_perm[move * N_PERM4 + sp]
+            if max(t.corners_slice[ncp * N_PERM4 + nsp], t.edges_slice[nep * N_PERM4 + nsp]) < depth:
+                path.append(move)
+                found = self._phase2(ncp, nep, nsp, depth - 1, face, path)
+                if found is not None:
+                    return found
+
+                path.pop()
+
+        return None
+
+
+def solve(state: bytes, max_length: int = 22, timeout: float = 10.0) -> List[str]:
+    """Moves solving a cubie state whose pieces are labelled against its current centres. Returns as soon as a
+    solution of at most max_length moves is found, otherwise the shortest one found within timeout seconds. The first
+    solution is always searched for to the end, however long it takes."""
+    solution = _Search(state, max_length, timeout).run()
+    return [MOVE_NAMES[move] for move in solution]
+
+
+if __name__ == '__main__':
+    # build (or check) the table cache ahead of time, e.g. while installing
+    start = time.monotonic()
+    tables()
+    print('Two-phase tables ready in {} ({:.1f}s)'.format(TABLES_PATH, time.monotonic() - start))
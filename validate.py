@@ -0,0 +1,128 @@
+"""Checks that a cube can actually be solved, before any solver time is spent on it.
+
+A definition (see cube.build) can describe a cube that no sequence of moves reaches: a sticker of the wrong colour, a
+piece that does not exist or appears twice, a single twisted corner, a single flipped edge or two swapped pieces.
+The layer by layer solver only notices in its last steps and the two-phase search never does, so check first:
+
+- every colour is on exactly nine stickers, one of them a centre;
+- every position holds a real piece, and no piece appears twice;
+- the corner twists add up to a multiple of 3 and the edge flips to a multiple of 2;
+- the permutation of all 20 pieces is even (a quarter turn moves 4 corners and 4 edges, two odd cycles).
+
+read() raises ValueError for a cube that cannot be solved, the other checks return None for a solvable cube and the
+message otherwise. Batches of states, packed end to end as in facelets.py, have their twists and flips added up for
+every cube at once.
+"""
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).parent.absolute()))
+from typing import Iterable, List, Optional, Tuple
+import cubie, facelets
+
+STATE_LENGTH = facelets.STATE_LENGTH
+
+# translation of a code to 1 when a position cannot hold it, 0 when it can
+INVALID_CODES = tuple(bytes([0 if code < 60 and cubie.FACELET_FACES[pos][code] is not None else 1
+                             for code in range(256)]) for pos in range(STATE_LENGTH))
+# translation of a code to its twist (or flip)
+TWISTS = bytes([code % 3 for code in range(256)])
+
+
+def _reason(state: bytes) -> Optional[str]:
+    """why a state cannot be solved, None when it can"""
+    corners, edges = state[:8], state[8:]
+    if len(state) != STATE_LENGTH or max(corners) >= 24 or min(edges) < 24 or max(edges) >= 60 or \
+            2 in edges.translate(TWISTS):
+        return 'a position holds a piece that cannot be there'
+
+    pieces = state.translate(facelets.PIECES)
+    if len(set(pieces)) != STATE_LENGTH:
+        return 'a piece appears twice'
+
+    return _solvable(pieces, sum(corners.translate(TWISTS)), sum(edges.translate(TWISTS)))
+
+
+def _solvable(pieces: bytes, twist: int, flip: int) -> Optional[str]:
+    if twist % 3:
+        return 'a corner is twisted'
+
+    if flip % 2:
+        return 'an edge is flipped'
+
+    if cubie.parity(pieces):
+        return 'two pieces are swapped'
+
+
+def state_problem(state: bytes) -> Optional[str]:
+    reason = _reason(state)
+    if reason is not None:
+        return 'Cube cannot be solved: {}'.format(reason)
+
+
+def read(definition: str) -> Tuple[bytes, facelets.Palette]:
+    """state and palette of a definition (see facelets.to_state), raising ValueError if it cannot be solved"""
+    definition = definition.lower()
+    if len(definition) == facelets.DEFINITION_LENGTH:
+        counts = {colour: definition.count(colour) for colour in facelets.palette_of(definition)}
+        for colour, count in counts.items():
+            if count != 9:
+                raise ValueError('Cube definition "{}" has {} {} stickers rather than 9'.format(definition, count,
+                                                                                               colour))
+
+    state, palette = facelets.to_state(definition)
+    reason = _reason(state)
+    if reason is not None:
+        raise ValueError('Cube definition "{}" cannot be solved: {}'.format(definition, reason))
+
+    return state, palette
+
+
+def problem(definition: str) -> Optional[str]:
+    try:
+        read(definition)
+
+    except ValueError as error:
+        return str(error)
+
+
+def is_valid(definition: str) -> bool:
+    return problem(definition) is None
+
+
+def state_problems(states: bytes) -> List[Optional[str]]:
+    """state_problem of every state in a batch"""
+    count = len(states) // STATE_LENGTH
+    if count * STATE_LENGTH != len(states):
+        raise ValueError('Batch states must be 20 bytes each')
+
+    # per position columns added up lane by lane, one lane per cube: no lane goes past 20
+    invalid = twist = flip = 0
+    for pos in range(STATE_LENGTH):
+        column = states[pos::STATE_LENGTH]
+        invalid += int.from_bytes(column.translate(INVALID_CODES[pos]), 'big')
+        if pos < 8:
+            twist += int.from_bytes(column.translate(TWISTS), 'big')
+        else:
+            flip += int.from_bytes(column.translate(TWISTS), 'big')
+
+    pieces = states.translate(facelets.PIECES)
+    lanes = zip(invalid.to_bytes(count, 'big'), twist.to_bytes(count, 'big'), flip.to_bytes(count, 'big'))
+    results = []
+    for idx, (bad, corner_twist, edge_flip) in enumerate(lanes):
+        if bad:
+            reason = 'a position holds a piece that cannot be there'
+        else:
+            cube_pieces = pieces[idx * STATE_LENGTH:(idx + 1) * STATE_LENGTH]
+            if len(set(cube_pieces)) != STATE_LENGTH:
+                reason = 'a piece appears twice'
+            else:
+                reason = _solvable(cube_pieces, corner_twist, edge_flip)
+
+        results.append(None if reason is None else 'Cube cannot be solved: {}'.format(reason))
+
+    return results
+
+
+def problems(definitions: Iterable[str]) -> List[Optional[str]]:
+    """problem of every definition"""
+    return [problem(definition) for definition in definitions]